@@ -0,0 +1,261 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import csv
+import re
+import tracemalloc
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, TextIO
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+CHANNEL_PATTERN = re.compile(r'\bCh(\d+)\b')
+SAMPLE_PATTERN = re.compile(r'^SAMPLE(\d+)_(\w+)$')
+INDEXED_RECORDS = ('INFO', 'STARTUPAXIS', 'FILEOPENTIME', 'BYAPP')
+
+STRING_COLUMNS = ('Comment',)
+STRING_COLUMN_MARKERS = ('Status', 'Measurement Mode')
+
+
+@dataclass
+class HeaderIndex:
+    '''
+    The `INFO`, `STARTUPAXIS`, `FILEOPENTIME` and `BYAPP` records of a PPMS header,
+    bucketed by key in a single pass.
+    '''
+    records: Dict[str, List[str]] = field(default_factory=dict)
+    info: Dict[str, str] = field(default_factory=dict)
+    samples: Dict[int, Dict[str, str]] = field(default_factory=dict)
+
+
+def index_header(header_lines: List[str]) -> HeaderIndex:
+    '''
+    Buckets the header lines by record type. The remainder of each line after the
+    record type is kept in `records`. `INFO` lines are further split into sample
+    properties (`INFO,<value>,SAMPLE<n>_<PROPERTY>`) and other information
+    (`INFO,<KEY>,<value>`).
+    '''
+    index = HeaderIndex(records={key: [] for key in INDEXED_RECORDS})
+    for line in header_lines:
+        key, _, remainder = line.partition(',')
+        if key not in index.records:
+            continue
+        index.records[key].append(remainder)
+        if key != 'INFO':
+            continue
+        fields = [part.strip() for part in remainder.split(',')]
+        match = SAMPLE_PATTERN.match(fields[-1])
+        if match:
+            sample = index.samples.setdefault(int(match.group(1)), {})
+            sample[match.group(2).lower()] = ','.join(fields[:-1])
+        else:
+            index.info[fields[0]] = ', '.join(fields[1:])
+    return index
+
+
+class LazyColumns(Mapping):
+    '''
+    Read-only mapping of column names to arrays. The parsed chunks of a column are
+    only concatenated into a single array on first access.
+    '''
+
+    def __init__(self, chunks: Dict[str, List[np.ndarray]], dtypes: Dict[str, type]):
+        self._chunks = chunks
+        self._dtypes = dtypes
+        self._arrays = {}
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if key not in self._arrays:
+            parts = self._chunks[key]
+            if len(parts) == 1:
+                array = parts[0]
+            elif parts:
+                array = np.concatenate(parts)
+            else:
+                array = np.empty(0, dtype=self._dtypes[key])
+            self._arrays[key] = array
+            self._chunks[key] = [array]
+        return self._arrays[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._chunks)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+
+def column_group(name: str) -> str:
+    '''
+    Returns the group of the column `name`: `ETO Channel`, `Ch<n>` or `other`.
+    '''
+    if 'ETO Channel' in name:
+        return 'ETO Channel'
+    match = CHANNEL_PATTERN.search(name)
+    if match:
+        return f'Ch{match.group(1)}'
+    return 'other'
+
+
+@dataclass
+class PPMSFileData:
+    '''Columnar content of a PPMS .dat file.'''
+    header_lines: List[str] = field(default_factory=list)
+    header: HeaderIndex = field(default_factory=HeaderIndex)
+    columns: Mapping = field(default_factory=dict)
+    n_rows: int = 0
+    datasets: Dict[str, str] = field(default_factory=dict)
+    preview_stride: int = 1
+    peak_memory: Optional[int] = None
+
+    def group_columns(self) -> Dict[str, List[str]]:
+        '''
+        Sorts the column names into the groups `other`, `Ch<n>` for every channel
+        and `ETO Channel`.
+        '''
+        groups = {'other': [], 'ETO Channel': []}
+        for key in self.columns:
+            groups.setdefault(column_group(key), []).append(key)
+        return groups
+
+
+def column_dtype(name: str):
+    '''
+    Returns the dtype used for parsing the column `name`. Comments and status codes
+    are kept as strings, every other column is parsed as float64.
+    '''
+    if name in STRING_COLUMNS or any(m in name for m in STRING_COLUMN_MARKERS):
+        return object
+    return np.float64
+
+
+def read_header(file: TextIO) -> List[str]:
+    '''
+    Reads the `[Header]` block line by line and stops after the `[Data]` marker,
+    leaving `file` positioned at the column names.
+    '''
+    header_lines = []
+    line = file.readline()
+    while line:
+        line = line.strip()
+        if line == '[Data]':
+            return header_lines
+        if line and line != '[Header]':
+            header_lines.append(line)
+        line = file.readline()
+    raise ValueError('No [Data] section found in PPMS file.')
+
+
+def read_column_names(file: TextIO) -> List[str]:
+    '''
+    Reads the column names following the `[Data]` marker.
+    '''
+    names = next(csv.reader([file.readline()]), [])
+    return [name.strip() for name in names]
+
+
+def iter_data_chunks(
+    file: TextIO,
+    names: List[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict[str, np.ndarray]]:
+    '''
+    Parses the data block in chunks of `chunk_size` rows and yields one typed array
+    per column for every chunk.
+    '''
+    dtypes = {name: column_dtype(name) for name in names}
+    reader = pd.read_csv(
+        file,
+        names=names,
+        dtype=dtypes,
+        sep=',',
+        skipinitialspace=True,
+        chunksize=chunk_size,
+        engine='c',
+    )
+    for chunk in reader:
+        arrays = {}
+        for name in names:
+            column = chunk[name]
+            if dtypes[name] is object:
+                column = column.fillna('')
+            arrays[name] = column.to_numpy(dtype=dtypes[name])
+        yield arrays
+
+
+@contextmanager
+def peak_memory_tracker(data: PPMSFileData, enabled: bool = True):
+    '''
+    Records the peak memory traced while the context is active in
+    `data.peak_memory` (in bytes). If memory is already being traced, e.g. by a
+    profiler, the running tracer is left untouched and nothing is recorded.
+    '''
+    if not enabled or tracemalloc.is_tracing():
+        yield
+        return
+    tracemalloc.start()
+    try:
+        yield
+        data.peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def read_ppms_dat(
+    file: TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    track_memory: bool = False,
+) -> PPMSFileData:
+    '''
+    Streams a PPMS .dat file. The header is scanned line by line and the data block
+    is parsed in chunks of `chunk_size` rows straight into typed arrays.
+
+    Args:
+        file (TextIO): An open text handle of the .dat file.
+        chunk_size (int): The number of rows parsed at once.
+        track_memory (bool): Whether to record the peak memory allocated while
+            reading in `PPMSFileData.peak_memory` (in bytes). This slows down the
+            read and assembles all columns right away, so it is meant for
+            benchmarks and tests only.
+
+    Returns:
+        PPMSFileData: The header lines, the header index and the columns. The array
+        of each column is assembled from its chunks on first access.
+    '''
+    data = PPMSFileData()
+    with peak_memory_tracker(data, track_memory):
+        data.header_lines = read_header(file)
+        data.header = index_header(data.header_lines)
+        names = read_column_names(file)
+        chunks = {name: [] for name in names}
+        for arrays in iter_data_chunks(file, names, chunk_size):
+            for name in names:
+                chunks[name].append(arrays[name])
+            data.n_rows += len(arrays[names[0]])
+        data.columns = LazyColumns(
+            chunks, {name: column_dtype(name) for name in names}
+        )
+        if track_memory:
+            # assemble the columns so that the peak includes the concatenation
+            for name in names:
+                data.columns[name]
+    return data
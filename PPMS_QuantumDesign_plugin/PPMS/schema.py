@@ -18,10 +18,11 @@
 # from .schema import *
 
 import re
-from io import StringIO
 import numpy as np
-import pandas as pd
 from datetime import datetime
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
 
 from nomad.metainfo import Package, Quantity, MEnum, SubSection, Section, MSection
 from nomad.datamodel.data import EntryData, ArchiveSection
@@ -35,17 +36,20 @@ from nomad.datamodel.metainfo.annotations import (
 
 from nomad.files import UploadFiles
 from nomad.datamodel.util import parse_path
+from nomad.units import ureg
+
+from PPMS.reader import CHANNEL_PATTERN, column_group, read_ppms_dat
+from PPMS.sidecar import write_ppms_hdf5
 
 m_package = Package(name='PPMS')
 
 
 def clean_channel_keys(input_key: str) -> str:
     output_key = (
-        input_key
+        CHANNEL_PATTERN.sub('', input_key)
         .split('(')[0]
         .replace('Std. Dev.', 'std dev')
-        .replace('Ch1','')
-        .replace('Ch2','')
+        .replace('-','')
         .strip()
         .lower()
         .replace(' ','_')
@@ -72,7 +76,25 @@ class Sample(CompositeSystem):
         type=str,
         description='FILL')
 
-class ChannelData(ArchiveSection):
+class HDF5Dataset(ArchiveSection):
+    '''Reference to the full resolution data of a quantity in an HDF5 file'''
+    m_def = Section(
+        label_quantity='quantity',
+    )
+    quantity = Quantity(
+        type=str,
+        description='The name of the quantity holding the preview of the dataset.')
+    reference = Quantity(
+        type=str,
+        description='The HDF5 file and dataset path as `<file>#<path>`.')
+
+
+class PPMSArrays(ArchiveSection):
+    '''Section whose array quantities can be stored in an HDF5 file'''
+    datasets = SubSection(section_def=HDF5Dataset, repeats=True)
+
+
+class ChannelData(PPMSArrays):
     '''Data section from Channels in PPMS'''
     m_def = Section(
         label_quantity='name',
@@ -158,7 +180,7 @@ class ChannelData(ArchiveSection):
         description='FILL')
 
 
-class ETOData(ArchiveSection):
+class ETOData(PPMSArrays):
     '''Data section from Channels in PPMS'''
     m_def = Section(
         label_quantity='name',
@@ -174,11 +196,24 @@ class ETOData(ArchiveSection):
         description='FILL')
 
 
-class PPMSData(ArchiveSection):
+class PPMSData(PPMSArrays):
     '''Data section from PPMS'''
     m_def = Section(
         a_eln=dict(lane_width='600px'),
     )
+    hdf5_file = Quantity(
+        type=str,
+        description='The HDF5 file holding the full resolution data.',
+        a_browser=dict(adaptor='RawFileAdaptor'))
+    number_of_rows = Quantity(
+        type=int,
+        description='The number of rows in the data block of the PPMS file.')
+    preview_stride = Quantity(
+        type=int,
+        description='''
+        The row stride of the arrays when the full resolution data is stored in
+        `hdf5_file`, 1 otherwise.
+        ''')
     timestamp = Quantity(
         type=np.dtype(np.float64),
         unit='second',
@@ -232,6 +267,127 @@ class PPMSData(ArchiveSection):
     eto_channels = SubSection(section_def=ETOData, repeats=True)
 
 
+PPMS_UNITS = {
+    'Ohms': 'ohm',
+    'K': 'kelvin',
+    'Oe': 'gauss',
+    'Torr': 'torr',
+    'deg': 'deg',
+    's': 'second',
+    'mA': 'mA',
+    'V': 'V',
+    'Hz': 'Hz',
+}
+
+
+class ColumnRoute(NamedTuple):
+    '''Target of a single PPMS data column.'''
+    column: str
+    section: str
+    name: Optional[str]
+    quantity: Quantity
+    unit: Optional[str]
+
+
+def clean_data_key(input_key: str) -> str:
+    return (
+        input_key
+        .split('(')[0]
+        .strip()
+        .lower()
+        .replace('time stamp', 'timestamp')
+        .replace(' ', '_')
+    )
+
+
+def column_unit(column: str, quantity: Quantity) -> Optional[str]:
+    '''
+    Returns the unit for `column`, taken from the column name if known and from the
+    quantity definition otherwise.
+    '''
+    if quantity.unit is None:
+        return None
+    match = re.search(r'\(([^)]*)\)', column)
+    if match and match.group(1) in PPMS_UNITS:
+        return PPMS_UNITS[match.group(1)]
+    return str(quantity.unit)
+
+
+@lru_cache(maxsize=32)
+def get_column_routes(columns: Tuple[str, ...]) -> Tuple[ColumnRoute, ...]:
+    '''
+    Builds the routing table that maps the raw PPMS column names to the section,
+    quantity and unit they are stored in. The table is cached per header signature,
+    i.e. per distinct tuple of column names.
+
+    Args:
+        columns (Tuple[str, ...]): The column names of the PPMS file.
+
+    Returns:
+        Tuple[ColumnRoute, ...]: One route per column that has a target quantity.
+    '''
+    data_quantities = PPMSData.m_def.all_quantities
+    channel_quantities = ChannelData.m_def.all_quantities
+    routes = []
+    for column in columns:
+        group = column_group(column)
+        if group == 'ETO Channel':
+            section, name, quantity = 'eto', column, ETOData.eto_channel
+        elif group != 'other':
+            quantity = channel_quantities.get(clean_channel_keys(column))
+            section, name = 'channel', f'Channel {group[2:]}'
+        else:
+            quantity = data_quantities.get(clean_data_key(column))
+            section, name = 'data', None
+        if quantity is None:
+            continue
+        routes.append(
+            ColumnRoute(column, section, name, quantity, column_unit(column, quantity))
+        )
+    return tuple(routes)
+
+
+def route_columns(
+    data: PPMSData,
+    columns: Mapping,
+    routes: Tuple[ColumnRoute, ...],
+    datasets: Optional[Dict[str, str]] = None,
+) -> None:
+    '''
+    Assigns the columns to `data` and its channel sub sections following `routes`.
+    Numeric columns are set as contiguous float64 arrays with their unit attached.
+    If `datasets` is given, a reference to the HDF5 dataset of each column is added
+    to the section as well.
+    '''
+    sections = {}
+    for route in routes:
+        if route.section == 'data':
+            section = data
+        else:
+            section = sections.get(route.name)
+        if section is None:
+            if route.section == 'eto':
+                section = ETOData(name=route.name)
+                data.m_add_sub_section(PPMSData.eto_channels, section)
+            else:
+                section = ChannelData(name=route.name)
+                data.m_add_sub_section(PPMSData.channels, section)
+            sections[route.name] = section
+        values = columns[route.column]
+        if values.dtype != object:
+            values = np.ascontiguousarray(values, dtype=np.float64)
+            if route.unit is not None:
+                values = ureg.Quantity(values, route.unit)
+        section.m_set(route.quantity, values)
+        if datasets:
+            section.datasets.append(
+                HDF5Dataset(
+                    quantity=route.quantity.name,
+                    reference=f'{data.hdf5_file}#{datasets[route.column]}',
+                )
+            )
+
+
 class PPMSMeasurement(Measurement, EntryData):
     """A parser for PPMS measurement data"""
 
@@ -253,6 +409,14 @@ class PPMSMeasurement(Measurement, EntryData):
         type=str,
         shape=['*'],
         description='FILL')
+    store_data_in_hdf5 = Quantity(
+        type=bool,
+        default=False,
+        description='''
+        Whether to stream the data into a chunked, compressed HDF5 file next to the
+        data file. The archive then only holds a downsampled preview of the arrays.
+        ''',
+        a_eln=dict(component='BoolEditQuantity'))
     data = SubSection(section_def=PPMSData)
 
     def normalize(self, archive, logger):
@@ -260,105 +424,46 @@ class PPMSMeasurement(Measurement, EntryData):
 
         if archive.data.data_file:
             logger.info('Parsing PPMS measurement file.')
+            hdf5_file = None
             with archive.m_context.raw_file(self.data_file, 'r') as file:
-                data = file.read()
-
-            header_match = re.search(r'\[Header\](.*?)\[Data\]', data, re.DOTALL)
-            header_section = header_match.group(1).strip()
-            header_lines = header_section.split('\n')
-
-            sample1_headers = [line for line in header_lines if line.startswith("INFO") and 'SAMPLE1_' in line]
-            if sample1_headers:
-                sample_1 = Sample()
-                for line in sample1_headers:
-                    parts = re.split(r',\s*', line)
-                    key = parts[2].lower().replace('SAMPLE1_','')
-                    if hasattr(sample_1, key):
-                        setattr(sample_1, key, parts[1])
-
-            sample2_headers = [line for line in header_lines if line.startswith("INFO") and 'SAMPLE2_' in line]
-            if sample2_headers:
-                sample_2 = Sample()
-                for line in sample2_headers:
-                    parts = re.split(r',\s*', line)
-                    key = parts[2].lower().replace('SAMPLE2_','')
-                    if hasattr(sample_2, key):
-                        setattr(sample_2, key, parts[1])
-
+                if self.store_data_in_hdf5:
+                    hdf5_file = f'{self.data_file.rsplit(".", 1)[0]}.h5'
+                    with archive.m_context.raw_file(hdf5_file, 'w+b') as h5:
+                        ppms_data = write_ppms_hdf5(file, h5)
+                else:
+                    ppms_data = read_ppms_dat(file)
+            logger.info('Read PPMS measurement file.', rows=ppms_data.n_rows)
+            header = ppms_data.header
+
+            if header.samples:
                 while self.samples:
                     self.m_remove_sub_section(PPMSMeasurement.samples, 0)
-                self.m_add_sub_section(PPMSMeasurement.samples, sample_1)
-                self.m_add_sub_section(PPMSMeasurement.samples, sample_2)
-
-            startupaxis_headers = [line for line in header_lines if line.startswith("STARTUPAXIS")]
-            if startupaxis_headers:
-                startupaxis = []
-                for line in startupaxis_headers:
-                    parts = line.split(',', 1)
-                    startupaxis.append(parts[1])
-                if hasattr(self, 'startupaxis'):
-                    setattr(self, 'startupaxis', startupaxis)
-
-            for line in header_lines:
-                if line.startswith("FILEOPENTIME"):
-                    if hasattr(self, 'datetime'):
-                        iso_date = datetime.strptime(line.split(',')[3], "%d/%m/%Y %H:%M:%S")
-                        setattr(self, 'datetime', iso_date)
-                if line.startswith("BYAPP"):
-                    if hasattr(self, 'software'):
-                        setattr(self, 'software', line.replace('BYAPP,', ''))
-
-            data_section = header_match.string[header_match.end():]
-            data_buffer = StringIO(data_section)
-            data_df = pd.read_csv(data_buffer, header=None, skipinitialspace=True, sep=',')
-            # Rename columns using the first row of data
-            data_df.columns = data_df.iloc[0]
-            data_df = data_df.iloc[1:].reset_index(drop=True)
-
-
-            print(data_df.keys())
-
-            other_data = [key for key in data_df.keys() if 'Ch1' not in key and 'Ch2' not in key and 'ETO Channel' not in key]
-            self.data = PPMSData()
-            for key in other_data:
-                clean_key = key.split('(')[0].strip().replace(' ','_').lower().replace('time stamp','timestamp')
-                if hasattr(self.data, clean_key):
-                    setattr(self.data,
-                            clean_key,
-                            data_df[key] # * ureg(data_template[f'{key}/@units'])
-                            )
-            channel_1_data = [key for key in data_df.keys() if 'Ch1' in key]
-            if channel_1_data:
-                channel_1 = ChannelData()
-                setattr(channel_1, 'name', 'Channel 1')
-                for key in channel_1_data:
-                    clean_key = clean_channel_keys(key)
-                    if hasattr(channel_1, clean_key):
-                        setattr(channel_1,
-                                clean_key,
-                                data_df[key] # * ureg(data_template[f'{key}/@units'])
-                                )
-                self.data.m_add_sub_section(PPMSData.channels, channel_1)
-            channel_2_data = [key for key in data_df.keys() if 'Ch2' in key]
-            if channel_2_data:
-                channel_2 = ChannelData()
-                setattr(channel_2, 'name', 'Channel 2')
-                for key in channel_2_data:
-                    clean_key = clean_channel_keys(key)
-                    if hasattr(channel_2, clean_key):
-                        setattr(channel_2,
-                                clean_key,
-                                data_df[key] # * ureg(data_template[f'{key}/@units'])
-                                )
-                self.data.m_add_sub_section(PPMSData.channels, channel_2)
-            eto_channel_data = [key for key in data_df.keys() if 'ETO Channel' in key]
-            if eto_channel_data:
-                for key in eto_channel_data:
-                    eto_channel = ETOData()
-                    if hasattr(eto_channel, 'name'):
-                        setattr(eto_channel, 'name', key)
-                    if hasattr(eto_channel, 'ETO_channel'):
-                        setattr(eto_channel, 'ETO_channel', data_df[key])
-                    self.data.m_add_sub_section(PPMSData.eto_channels, eto_channel)
+                for number in sorted(header.samples):
+                    sample = Sample()
+                    for key, value in header.samples[number].items():
+                        if key in Sample.m_def.all_quantities:
+                            sample.m_set(Sample.m_def.all_quantities[key], value)
+                    self.m_add_sub_section(PPMSMeasurement.samples, sample)
+
+            if header.records['STARTUPAXIS']:
+                self.startupaxis = header.records['STARTUPAXIS']
+            if header.records['FILEOPENTIME']:
+                file_open_time = header.records['FILEOPENTIME'][0].split(',')[2]
+                self.file_open_time = file_open_time
+                self.datetime = datetime.strptime(file_open_time, "%d/%m/%Y %H:%M:%S")
+            if header.records['BYAPP']:
+                self.software = header.records['BYAPP'][0].strip()
+
+            self.data = PPMSData(
+                hdf5_file=hdf5_file,
+                number_of_rows=ppms_data.n_rows,
+                preview_stride=ppms_data.preview_stride,
+            )
+            route_columns(
+                self.data,
+                ppms_data.columns,
+                get_column_routes(tuple(ppms_data.columns)),
+                ppms_data.datasets,
+            )
 
 m_package.__init_metainfo__()
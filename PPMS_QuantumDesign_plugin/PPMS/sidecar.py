@@ -0,0 +1,142 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import BinaryIO, Dict, List, TextIO
+
+import numpy as np
+
+from PPMS.reader import (
+    DEFAULT_CHUNK_SIZE,
+    PPMSFileData,
+    column_dtype,
+    index_header,
+    iter_data_chunks,
+    peak_memory_tracker,
+    read_column_names,
+    read_header,
+)
+
+DEFAULT_PREVIEW_POINTS = 1000
+HDF5_CHUNK_ROWS = 2**16
+HDF5_DATA_GROUP = 'data'
+
+
+class StridePreview:
+    '''
+    Keeps every `stride`-th row of a stream of chunks with a bounded number of
+    points. Whenever more than twice `max_points` rows are held, every other row is
+    dropped and the stride is doubled, so the memory use does not grow with the
+    length of the stream.
+    '''
+
+    def __init__(self, names: List[str], max_points: int = DEFAULT_PREVIEW_POINTS):
+        self.max_points = max_points
+        self.stride = 1
+        self.n_points = 0
+        self._parts = {name: [] for name in names}
+
+    def add(self, arrays: Dict[str, np.ndarray], offset: int) -> None:
+        '''
+        Adds a chunk whose first row has the global index `offset`.
+        '''
+        start = -offset % self.stride
+        for name, parts in self._parts.items():
+            parts.append(arrays[name][start :: self.stride].copy())
+        n_rows = len(next(iter(arrays.values())))
+        self.n_points += len(range(start, n_rows, self.stride))
+        while self.n_points > 2 * self.max_points:
+            for name, parts in self._parts.items():
+                self._parts[name] = [np.concatenate(parts)[::2].copy()]
+            self.n_points = (self.n_points + 1) // 2
+            self.stride *= 2
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            name: np.concatenate(parts) if parts else np.empty(0, column_dtype(name))
+            for name, parts in self._parts.items()
+        }
+
+
+def dataset_name(column: str) -> str:
+    '''
+    Returns the HDF5 dataset path for the PPMS column `column`.
+    '''
+    return f'/{HDF5_DATA_GROUP}/{column.replace("/", "_")}'
+
+
+def write_ppms_hdf5(
+    file: TextIO,
+    hdf5_file: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    preview_points: int = DEFAULT_PREVIEW_POINTS,
+    track_memory: bool = False,
+) -> PPMSFileData:
+    '''
+    Streams the data block of a PPMS .dat file into chunked, gzip compressed datasets
+    of an HDF5 file. Only one chunk of rows and a decimated preview are held in
+    memory at any time.
+
+    Args:
+        file (TextIO): An open text handle of the .dat file.
+        hdf5_file (BinaryIO): A readable and writable binary handle for the HDF5 file.
+        chunk_size (int): The number of rows parsed at once.
+        preview_points (int): The minimum number of points kept in the preview.
+        track_memory (bool): Whether to record the peak memory allocated while
+            reading in `PPMSFileData.peak_memory` (in bytes). This slows down the
+            read, so it is meant for benchmarks and tests only.
+
+    Returns:
+        PPMSFileData: The header lines, the header index and the decimated preview
+        of every column. `datasets` maps each column to its HDF5 dataset and
+        `preview_stride` holds the row stride of the preview.
+    '''
+    import h5py
+
+    data = PPMSFileData()
+    with peak_memory_tracker(data, track_memory):
+        data.header_lines = read_header(file)
+        data.header = index_header(data.header_lines)
+        names = read_column_names(file)
+        preview = StridePreview(names, preview_points)
+        with h5py.File(hdf5_file, 'w') as h5:
+            datasets = {}
+            for name in names:
+                dtype = column_dtype(name)
+                datasets[name] = h5.create_dataset(
+                    dataset_name(name),
+                    shape=(0,),
+                    maxshape=(None,),
+                    dtype=h5py.string_dtype() if dtype is object else dtype,
+                    chunks=(min(chunk_size, HDF5_CHUNK_ROWS),),
+                    compression='gzip',
+                    shuffle=dtype is not object,
+                )
+                datasets[name].attrs['column'] = name
+            for arrays in iter_data_chunks(file, names, chunk_size):
+                n_chunk = len(arrays[names[0]])
+                for name in names:
+                    dataset = datasets[name]
+                    dataset.resize((data.n_rows + n_chunk,))
+                    dataset[data.n_rows :] = arrays[name]
+                preview.add(arrays, data.n_rows)
+                data.n_rows += n_chunk
+            h5.attrs['n_rows'] = data.n_rows
+        data.columns = preview.arrays()
+        data.datasets = {name: dataset_name(name) for name in names}
+        data.preview_stride = preview.stride
+    return data
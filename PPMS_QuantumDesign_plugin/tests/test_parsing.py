@@ -1,7 +1,13 @@
+import tracemalloc
+
+import h5py
+import numpy as np
 import pytest
 from glob import glob
 from nomad.client import parse, normalize_all
 import Lakeshore
+from PPMS.reader import read_ppms_dat
+from PPMS.sidecar import write_ppms_hdf5
 
 def get_test_files():
     """Get the transformation example file path."""
@@ -21,4 +27,43 @@ def get_test_files():
 @pytest.mark.parametrize('test_file', glob('tests/data/testPPMS.dat'))
 def test_schema(test_file):
     entry_archive = parse(test_file)[0]
-    normalize_all(entry_archive)
\ No newline at end of file
+    normalize_all(entry_archive)
+
+@pytest.mark.parametrize('test_file', glob('tests/data/testPPMS.dat'))
+def test_reader(test_file):
+    with open(test_file) as file:
+        ppms_data = read_ppms_dat(file, chunk_size=10, track_memory=True)
+    groups = ppms_data.group_columns()
+    assert len(groups['Ch1']) == len(groups['Ch2']) == 20
+    assert len(groups['ETO Channel']) == 16
+    assert ppms_data.columns['Temperature (K)'].dtype == np.float64
+    assert all(len(column) == 81 for column in ppms_data.columns.values())
+    assert ppms_data.peak_memory > 0
+    assert sorted(ppms_data.header.samples) == [1, 2]
+    assert ppms_data.header.samples[1]['material'] == 'EuCuAs'
+    assert len(ppms_data.header.records['STARTUPAXIS']) == 5
+
+    tracemalloc.start()
+    try:
+        with open(test_file) as file:
+            ppms_data = read_ppms_dat(file, track_memory=True)
+        assert ppms_data.peak_memory is None
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('test_file', glob('tests/data/testPPMS.dat'))
+def test_hdf5_sidecar(test_file, tmp_path):
+    with open(test_file) as file, open(tmp_path / 'test.h5', 'w+b') as h5:
+        preview = write_ppms_hdf5(file, h5, chunk_size=10, preview_points=10)
+    with open(test_file) as file:
+        full = read_ppms_dat(file)
+    assert preview.n_rows == 81
+    assert 10 <= len(preview.columns['Temperature (K)']) <= 20
+    with h5py.File(tmp_path / 'test.h5') as h5:
+        temperature = h5[preview.datasets['Temperature (K)']][:]
+    assert np.array_equal(temperature, full.columns['Temperature (K)'])
+    assert np.array_equal(
+        temperature[:: preview.preview_stride], preview.columns['Temperature (K)']
+    )
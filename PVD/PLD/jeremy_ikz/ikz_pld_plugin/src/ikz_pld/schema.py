@@ -22,11 +22,15 @@ import datetime
 
 import numpy as np
 import plotly.graph_objects as go
+import requests
 
 from typing import (
-    Union,
-    Dict,
+    IO,
     Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
     TYPE_CHECKING,
 )
 from nomad_material_processing import (
@@ -60,6 +64,15 @@ from nomad_material_processing.physical_vapor_deposition import (
 from nomad_material_processing.utils import (
     create_archive,
 )
+from ikz_pld.utils import (
+    PubChemCache,
+    pubchem_cache_keys,
+    convert_units,
+    create_archives,
+    minmax_indices,
+    point_budgets,
+    step_mean,
+)
 from nomad.metainfo import (
     Package,
     Quantity,
@@ -111,19 +124,154 @@ if TYPE_CHECKING:
 
 m_package = Package(name="IKZ PLD")
 
+pubchem_cache = PubChemCache()
+
 
-def read_dlog(file_path: str, logger: "BoundLogger" = None) -> Dict[str, Any]:
+DLOG_DTYPE = np.dtype(
+    [
+        ("time_s", np.float64),
+        ("temperature_degc", np.float32),
+        ("pressure2_mbar", np.float32),
+        ("o2_flow_sccm", np.float32),
+        ("n2_ar_flow_sccm", np.float32),
+        ("frequency_hz", np.float32),
+        ("laser_energy_mj", np.float32),
+        ("pressure1_mbar", np.float32),
+    ]
+)
+
+
+def read_dlog(file: Union[str, IO], logger: "BoundLogger" = None) -> np.recarray:
     """
-    Function for reading the dlog of an IKZ PLD process.
+    Function for reading the dlog of an IKZ PLD process. The tab separated columns
+    are parsed by the C engine of `pd.read_csv` with the fixed dtypes of
+    `DLOG_DTYPE`, trailing columns that are not in the schema (like the column of
+    zeros written by the logging software) are skipped while parsing. The process
+    time is kept as float64, the sensor readings have 4 significant digits and are
+    stored as float32.
+
+    Args:
+        file (Union[str, IO]): The path or an open handle of the PLD dlog file.
+        logger (BoundLogger, optional): A structlog logger. Defaults to None.
+
+    Returns:
+        np.recarray: The dlog data as a record array with the fields of `DLOG_DTYPE`.
+    """
+    import pandas as pd
+
+    names = list(DLOG_DTYPE.names)
+    df_data = pd.read_csv(
+        file,
+        sep="\t",
+        header=None,
+        names=names,
+        usecols=range(len(names)),
+        index_col=False,
+        dtype={name: DLOG_DTYPE[name] for name in names},
+        engine="c",
+    )
+    if logger is not None and df_data.isna().any(axis=None):
+        logger.warning("The dlog contains incomplete rows.")
+    return df_data.to_records(index=False)
+
+
+ELOG_STEP_DTYPE = np.dtype(
+    [
+        ("time_s", np.int64),
+        ("duration_s", np.int64),
+        ("recipe", object),
+        ("pulses", np.int64),
+        ("target", object),
+        ("temperature", object),
+    ]
+)
+ELOG_LINE = re.compile(r"^(\d+):(\d+):(\d+)\t(.*?)\s*$", re.MULTILINE)
+ELOG_ABORT = "Abort Button pressed"
+ELOG_STEP_START = re.compile(r"^Starting Process with Recipe\s*:\s*(?P<recipe>\S+)$")
+ELOG_PULSES = re.compile(r"^(?P<pulses>\d+) Laser-pulse fired on target$")
+ELOG_STEP_END = "Event completed"
+RECIPE_PATTERN = re.compile(r"^(?P<step>[a-z]*?)(?P<target>[A-Z]*)(?P<temp>\d*)$")
+
+
+def read_elog(
+    file: Union[str, IO], logger: "BoundLogger" = None
+) -> Tuple[np.recarray, int]:
+    """
+    Function for reading the elog of an IKZ PLD process. All `H:M:S` time stamps are
+    extracted in one pass over the text and converted to seconds at once. After the
+    first line, every step is logged as a group of three lines:
+
+        Starting Process with Recipe :<recipe>
+        <pulses> Laser-pulse fired on target
+        Event completed
+
+    and the last line marks the end of the process. Lines with "Abort Button
+    pressed" are ignored.
 
     Args:
-        file_path (str): The path to the PLD dlog file.
+        file (Union[str, IO]): The path or an open handle of the PLD elog file.
         logger (BoundLogger, optional): A structlog logger. Defaults to None.
 
+    Raises:
+        ValueError: If a line has no time stamp or the step lines are not grouped
+        as expected.
+
     Returns:
-        Dict[str, Any]: The flog data in a Python dictionary.
+        Tuple[np.recarray, int]: The steps as a record array with the fields of
+        `ELOG_STEP_DTYPE` and the end time of the process in seconds.
     """
-    raise NotImplementedError
+    if isinstance(file, str):
+        with open(file) as fh:
+            text = fh.read()
+    else:
+        text = file.read()
+    if isinstance(text, bytes):
+        text = text.decode()
+    lines = [line for line in text.splitlines() if line.strip()]
+    records = ELOG_LINE.findall("\n".join(lines))
+    if len(records) != len(lines):
+        for number, line in enumerate(lines, start=1):
+            if not ELOG_LINE.match(line):
+                raise ValueError(f"Line {number} of the elog has no time stamp: {line}")
+    numbers = [
+        number
+        for number, record in enumerate(records, start=1)
+        if ELOG_ABORT not in record[3]
+    ]
+    if logger is not None and len(numbers) < len(records):
+        logger.warning(f"Ignored {len(records) - len(numbers)} aborts in the elog.")
+    events = [records[number - 1][3] for number in numbers]
+    if len(events) < 2 or (len(events) - 2) % 3:
+        raise ValueError(
+            f"The elog has {len(events)} events, expected a first line, three "
+            "lines per step and a last line."
+        )
+    clock = np.array([records[number - 1][:3] for number in numbers], dtype=str)
+    times = clock.astype(np.int64).reshape(-1, 3) @ np.array([3600, 60, 1])
+
+    steps = np.recarray(((len(events) - 2) // 3,), dtype=ELOG_STEP_DTYPE)
+    steps["time_s"] = times[1:-1:3]
+    steps["duration_s"] = times[2:-1:3] - times[1:-1:3]
+    for step, idx in enumerate(range(1, len(events) - 1, 3)):
+        start = ELOG_STEP_START.match(events[idx])
+        pulses = ELOG_PULSES.match(events[idx + 1])
+        recipe = RECIPE_PATTERN.match(start["recipe"]) if start else None
+        for offset, valid, expected in (
+            (0, start, "Starting Process with Recipe :<recipe>"),
+            (0, recipe, "a recipe like depoSTO700"),
+            (1, pulses, "<pulses> Laser-pulse fired on target"),
+            (2, events[idx + 2] == ELOG_STEP_END, ELOG_STEP_END),
+        ):
+            if not valid:
+                raise ValueError(
+                    f"Line {numbers[idx + offset]} of the elog: expected "
+                    f"{expected}, found {events[idx + offset]}."
+                )
+        steps[step]["recipe"] = start["recipe"]
+        steps[step]["pulses"] = int(pulses["pulses"])
+        steps[step]["target"] = recipe["target"]
+        steps[step]["temperature"] = recipe["temp"]
+    return steps, int(times[-1])
 
 
 class IKZPLDCategory(EntryDataCategory):
@@ -132,6 +280,67 @@ class IKZPLDCategory(EntryDataCategory):
     )
 
 
+class IKZPLDPubChemSubstance(PubChemPureSubstanceSection):
+    """
+    A PubChem substance section whose PubChem lookups are served from the persistent
+    `pubchem_cache` of the node.
+    """
+
+    def normalize(self, archive: "EntryArchive", logger: "BoundLogger") -> None:
+        """
+        The normalizer for the `IKZPLDPubChemSubstance` class. Fills the section from
+        the cache if the substance was looked up before and only queries PubChem for
+        new or expired substances. Expired data is used if the lookup fails, and a
+        failed lookup does not stop the normalization, so the section also works on
+        nodes without internet access. Failed lookups are not repeated for
+        `pubchem_cache.miss_ttl` seconds.
+
+        Args:
+            archive (EntryArchive): The archive containing the section that is being
+            normalized.
+            logger (BoundLogger): A structlog logger.
+        """
+        keys = pubchem_cache_keys(self.pub_chem_cid, self.name)
+        cached = None
+        for key in keys:
+            cached = pubchem_cache.get(key, logger)
+            if cached is not None:
+                break
+        if cached is not None and cached.fresh:
+            self._fill_from_cache(cached.data)
+            super(PubChemPureSubstanceSection, self).normalize(archive, logger)
+            return
+        if any(pubchem_cache.missed(key, logger) for key in keys):
+            if cached is not None:
+                self._fill_from_cache(cached.data)
+            super(PubChemPureSubstanceSection, self).normalize(archive, logger)
+            return
+        try:
+            super(IKZPLDPubChemSubstance, self).normalize(archive, logger)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"PubChem lookup failed: {e}")
+            pubchem_cache.put_miss(keys, logger)
+            if cached is not None:
+                self._fill_from_cache(cached.data)
+            super(PubChemPureSubstanceSection, self).normalize(archive, logger)
+            return
+        if self.pub_chem_link is not None:
+            keys = tuple(dict.fromkeys(keys + pubchem_cache_keys(self.pub_chem_cid)))
+            pubchem_cache.put(keys, self.m_to_dict(), logger)
+            return
+        pubchem_cache.put_miss(keys, logger)
+        if cached is not None:
+            self._fill_from_cache(cached.data)
+
+    def _fill_from_cache(self, data: Dict[str, Any]) -> None:
+        cached_section = PubChemPureSubstanceSection.m_from_dict(data)
+        for quantity in PubChemPureSubstanceSection.m_def.all_quantities.values():
+            if self.m_get(quantity) is None:
+                value = cached_section.m_get(quantity)
+                if value is not None:
+                    self.m_set(quantity, value)
+
+
 class IKZPLDTarget(PLDTarget, EntryData):
     """
     A section for describing a target used for pulsed laser deposition at IKZ Berlin.
@@ -344,11 +553,22 @@ class IKZPLDSubstrateBatch(CompositeSystem, EntryData):  # TODO: Inherit from ba
             len(sub.substrates) == 0 for sub in self.sub_batches
         ):
             if self.material:
-                substance_section = PubChemPureSubstanceSection(name=self.material)
+                substance_section = IKZPLDPubChemSubstance(name=self.material)
                 substance_section.normalize(archive, logger)
                 self.components = [
                     PureSubstanceComponent(pure_substance=substance_section)
                 ]
+            # the sections shared by all substrates are copied and serialized once
+            prototype = IKZPLDSubstrate(
+                components=[
+                    component.m_copy(deep=True) for component in self.components
+                ],
+                supplier_id=self.supplier_batch,
+                supplier=self.supplier,
+                dopants=[dopant.m_copy(deep=True) for dopant in self.dopants],
+            )
+            if self.geometry is not None:
+                prototype.geometry = self.geometry.m_copy(deep=True)
             for sub_batch_idx, sub_batch in enumerate(self.sub_batches):
                 if len(sub_batch.substrates) > 0:
                     continue
@@ -362,31 +582,29 @@ class IKZPLDSubstrateBatch(CompositeSystem, EntryData):  # TODO: Inherit from ba
                     - sub_batch.minimum_miscut_angle.magnitude
                 ) / 2
                 angle = sub_batch.minimum_miscut_angle.magnitude + angle_deviation
+                prototype.crystal_properties = SubstrateCrystalProperties(
+                    orientation=self.orientation,
+                    miscut=Miscut(
+                        orientation=self.miscut_orientation,
+                        angle=angle,
+                        angle_deviation=angle_deviation,
+                    ),
+                )
+                shared = prototype.m_to_dict(with_root_def=True)
+                entries = {
+                    file_name % (sub_batch_idx, substrate_idx): dict(
+                        shared,
+                        name=f"{batch_name} {sub_batch.name} substrate-{substrate_idx}",
+                    )
+                    for substrate_idx in range(sub_batch.amount)
+                }
+                references = create_archives(entries, archive, logger)
                 sub_batch.substrates = [
                     IKZPLDSubstrateReference(
                         substrate_number=substrate_idx,
-                        substrate=create_archive(
-                            IKZPLDSubstrate(
-                                name=f"{batch_name} {sub_batch.name} substrate-{substrate_idx}",
-                                geometry=self.geometry,
-                                crystal_properties=SubstrateCrystalProperties(
-                                    orientation=self.orientation,
-                                    miscut=Miscut(
-                                        orientation=self.miscut_orientation,
-                                        angle=angle,
-                                        angle_deviation=angle_deviation,
-                                    ),
-                                ),
-                                components=self.components,
-                                supplier_id=self.supplier_batch,
-                                supplier=self.supplier,
-                                dopants=self.dopants,
-                            ),
-                            archive,
-                            file_name % (sub_batch_idx, substrate_idx),
-                        ),
+                        substrate=reference,
                     )
-                    for substrate_idx in range(sub_batch.amount)
+                    for substrate_idx, reference in enumerate(references.values())
                 ]
 
         super(IKZPLDSubstrateBatch, self).normalize(archive, logger)
@@ -545,20 +763,26 @@ class IKZPLDStep(PLDStep):
                 ]
 
 
-def time_convert(x: Union[str, int]) -> int:
+def step_slices(
+    time: np.ndarray, starts: np.ndarray, durations: np.ndarray
+) -> List[slice]:
     """
-    Help function for converting time stamps in log file to seconds.
+    Help function for finding the rows of the data log belonging to each recipe step.
+    The rows `starts[i] <= time < starts[i] + durations[i]` are resolved for all steps
+    at once by a binary search, so the data of a step can be taken as a view.
 
     Args:
-        x (Union[str, int]): The time in the format %h:%m:%s.
+        time (np.ndarray): The non-decreasing process time of the data log rows.
+        starts (np.ndarray): The start time of every step.
+        durations (np.ndarray): The duration of every step.
 
     Returns:
-        int: The time in seconds.
+        List[slice]: The rows of every step.
     """
-    if isinstance(x, int):
-        return x
-    h, m, s = map(int, x.split(":"))
-    return (h * 60 + m) * 60 + s
+    starts = np.asarray(starts, dtype=float)
+    lower = np.searchsorted(time, starts, side="left")
+    upper = np.searchsorted(time, starts + np.asarray(durations, dtype=float))
+    return [slice(start, stop) for start, stop in zip(lower.tolist(), upper.tolist())]
 
 
 class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
@@ -649,6 +873,18 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
             label="Data log (.elog)",
         ),
     )
+    plot_points = Quantity(
+        type=int,
+        description="""
+        The maximum number of points per signal in the process plot. The signals
+        are decimated to this number of points while keeping their minima and
+        maxima. All points are plotted if not set.
+        """,
+        default=2000,
+        a_eln=ELNAnnotation(
+            component="NumberEditQuantity",
+        ),
+    )
     location = Quantity(
         type=str,
         description="""
@@ -665,72 +901,78 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
 
     def plot(self) -> None:
         """
-        Method for plotting the section.
+        Method for plotting the section. Every signal is drawn as one trace over all
+        steps, with a gap between the steps, and decimated to at most `plot_points`
+        points while keeping its peaks.
         """
-        fig = go.Figure()
-        x0 = None
-        y0 = None
-        y20 = None
-        y30 = None
-        shapes = []
+        signals = {
+            "pressure_mbar": [],
+            "power_w": [],
+            "temperature_degc": [],
+        }
+        times = []
         for step in self.steps:
-            x = step.environment.pressure.process_time.to("second").magnitude
-            y = step.environment.pressure.pressure.to("mbar").magnitude
-            y2 = step.sources[0].vapor_source.power.power.to("watt").magnitude
-            y3 = (
+            time = step.environment.pressure.process_time.to("second").magnitude
+            times.append(time)
+            signals["pressure_mbar"].append(
+                step.environment.pressure.pressure.to("mbar").magnitude
+            )
+            signals["power_w"].append(
+                step.sources[0].vapor_source.power.power.to("watt").magnitude
+            )
+            signals["temperature_degc"].append(
                 step.sample_parameters[0]
                 .temperature.temperature.to("celsius")
                 .magnitude
             )
-            if x0 is not None:
-                x = np.insert(x, 0, x0)
-                y = np.insert(y, 0, y0)
-                y2 = np.insert(y2, 0, y20)
-                y3 = np.insert(y3, 0, y30)
-            fig.add_trace(
-                go.Scatter(
-                    x=x,
-                    y=y,
-                    name=step.name,
-                    line=dict(color="#2A4CDF", width=2),
-                    yaxis="y",
-                ),
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=x,
-                    y=y3,
-                    name=step.name,
-                    line=dict(color="#008A68", width=2),
-                    yaxis="y3",
-                ),
-            )
+        lengths = [len(time) for time in times]
+        if not sum(lengths):
+            return
+        budgets = lengths
+        if self.plot_points:
+            budgets = point_budgets(lengths, self.plot_points)
+
+        gap = np.array([np.nan])
+        styles = {
+            "pressure_mbar": ("Chamber pressure", "#2A4CDF", "y"),
+            "power_w": ("Source power", "#192E87", "y2"),
+            "temperature_degc": ("Substrate temperature", "#008A68", "y3"),
+        }
+        fig = go.Figure()
+        for key, (name, color, yaxis) in styles.items():
+            x = []
+            y = []
+            for time, values, budget in zip(times, signals[key], budgets):
+                indices = minmax_indices(values, budget)
+                x.extend((time[indices], gap))
+                y.extend((values[indices], gap))
             fig.add_trace(
                 go.Scatter(
-                    x=x,
-                    y=y2,
-                    name=step.name,
-                    line=dict(color="#192E87", width=2),
-                    yaxis="y2",
+                    x=np.concatenate(x),
+                    y=np.concatenate(y),
+                    name=name,
+                    line=dict(color=color, width=2),
+                    yaxis=yaxis,
+                    connectgaps=False,
                 ),
             )
+        shapes = []
+        for step, time in zip(self.steps, times):
+            if not len(time):
+                continue
             fig.add_annotation(
                 text=step.name,
                 yref="paper",
-                x=(x[0] + (x[-1] - x[0]) / 2),
+                x=(time[0] + (time[-1] - time[0]) / 2),
                 y=0.85,
                 showarrow=False,
                 textangle=-90,
             )
-            x0 = x[-1]
-            y0 = y[-1]
-            y20 = y2[-1]
-            y30 = y3[-1]
             shapes.append(
                 dict(
                     type="line",
-                    x0=x[-1],
-                    x1=x[-1],
+                    x0=time[-1],
+                    x1=time[-1],
                     y0=0,
                     y1=1,
                     xref="x",
@@ -749,10 +991,6 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
             xaxis=dict(
                 fixedrange=False,
                 autorange=True,
-                rangeslider=dict(
-                    autorange=True,
-                    borderwidth=1,
-                ),
                 title="Process time / s",
                 mirror="all",
                 showline=True,
@@ -813,9 +1051,7 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
         self.figures = []
         layers = {}
         if self.data_log and self.recipe_log:
-            import pandas as pd
             import numpy as np
-            from nomad.units import ureg
 
             pattern = re.compile(
                 r"(?P<datetime>\d{8}_\d{4})-(?P<name>.+)\.(?P<type>d|e)log",
@@ -836,42 +1072,47 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
                 self.lab_id = self.process_identifiers.lab_id
 
             with archive.m_context.raw_file(self.recipe_log, "r") as e_log:
-                df_recipe = pd.read_csv(
-                    e_log,
-                    sep="\t",
-                    names=["time_h", "process"],
-                    header=None,
-                )
-            df_recipe = df_recipe[
-                ~df_recipe["process"].str.contains("Abort Button pressed")
-            ]
-            df_recipe["time_s"] = df_recipe["time_h"].apply(time_convert)
-            df_recipe["duration_s"] = df_recipe["time_s"].diff(-1) * -1
-            df_steps = df_recipe.iloc[1:-1:3, :].copy()
-            df_steps["pulses"] = (
-                df_recipe.iloc[2:-1:3, 1].str.split().str[0].values.astype(int)
-            )
-            df_steps["recipe"] = df_steps["process"].str.split(":").str[1]
+                recipe_steps, end_time_s = read_elog(e_log, logger)
             self.end_time = self.datetime + datetime.timedelta(
-                seconds=float(df_recipe.iloc[-1, 2]),
+                seconds=float(end_time_s),
             )
-            columns = [
-                "time_s",
-                "temperature_degc",
-                "pressure2_mbar",
-                "o2_flow_sccm",
-                "n2_ar_flow_sccm",
-                "frequency_hz",
-                "laser_energy_mj",
-                "pressure1_mbar",
-                "zeros",
-            ]
             with archive.m_context.raw_file(self.data_log, "r") as d_log:
-                df_data = pd.read_csv(
-                    d_log,
-                    sep="\t",
-                    names=columns,
-                )
+                dlog = read_dlog(d_log, logger)
+            if np.any(np.diff(dlog["time_s"]) < 0):
+                logger.warning("The dlog is not sorted by process time.")
+                dlog = dlog[np.argsort(dlog["time_s"], kind="stable")]
+            p2_range = (0.01 <= dlog["pressure1_mbar"]) & (
+                dlog["pressure1_mbar"] <= 0.1
+            )
+            time_s = dlog["time_s"]
+            pressure_pa = convert_units(
+                np.where(p2_range, dlog["pressure2_mbar"], dlog["pressure1_mbar"]),
+                "mbar",
+                "pascal",
+            )
+            temperature_k = convert_units(
+                dlog["temperature_degc"], "celsius", "kelvin"
+            )
+            frequency_hz = dlog["frequency_hz"].astype(np.float64)
+            laser_energy_j = convert_units(
+                dlog["laser_energy_mj"], "millijoule", "joule"
+            )
+            laser_power_w = laser_energy_j * frequency_hz
+            flow = "cm ** 3 / minute"
+            o2_flow = convert_units(dlog["o2_flow_sccm"], flow, "meter ** 3 / second")
+            n2_ar_flow = convert_units(
+                dlog["n2_ar_flow_sccm"], flow, "meter ** 3 / second"
+            )
+            attenuated_laser_energy = None
+            if self.attenuated_laser_energy is not None:
+                attenuated_laser_energy = self.attenuated_laser_energy.to(
+                    "joule"
+                ).magnitude
+            windows = step_slices(
+                dlog["time_s"],
+                recipe_steps["time_s"],
+                recipe_steps["duration_s"],
+            )
             substrate_ref = None
             sample_id = None
             if isinstance(self.substrate, MProxy):
@@ -884,63 +1125,46 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
                 substrate_ref = self.substrate.substrate
             steps = []
             target_recipe_names = [target.recipe_name for target in self.targets]
-            if len(self.steps) == len(df_steps):
+            if len(self.steps) == len(recipe_steps):
                 target_distances = [
                     step.sample_to_target_distance for step in self.steps
                 ]
             else:
-                target_distances = [None] * len(df_steps)
-            for target_distance, (_, row) in zip(target_distances, df_steps.iterrows()):
+                target_distances = [None] * len(recipe_steps)
+            for target_distance, window, row in zip(
+                target_distances, windows, recipe_steps
+            ):
                 if target_distance is not None:
                     target_distance = target_distance.to("meter").magnitude
-                step_pattern = re.compile(
-                    r"^(?P<step>[a-z]*?)(?P<target>[A-Z]*)(?P<temp>\d*)$"
-                )
-                step_match = step_pattern.match(row["recipe"])
                 target = None
                 target_name = None
                 try:
                     target = self.targets[
-                        target_recipe_names.index(step_match["target"])
+                        target_recipe_names.index(row["target"])
                     ]
                     target_name = f"Target: {target.name}"
                 except ValueError:
                     logger.warning(
-                        f'Target {step_match["target"]} not found in target list.'
+                        f'Target {row["target"]} not found in target list.'
                     )
                     target = None
-                    target_name = f"Unknown {step_match['target']} target"
-                data = df_data.loc[
-                    (row["time_s"] <= df_data["time_s"])
-                    & (df_data["time_s"] < (row["time_s"] + row["duration_s"]))
-                ].copy()
-                data["pressure_mbar"] = data["pressure1_mbar"]
-                p2_range = (0.01 <= data["pressure_mbar"]) & (
-                    data["pressure_mbar"] <= 0.1
-                )
-                data.loc[p2_range, "pressure_mbar"] = data.loc[
-                    p2_range, "pressure2_mbar"
-                ]
-                mean_laser_energy = data["laser_energy_mj"].replace(0, np.NaN).mean()
-                if np.isnan(mean_laser_energy):
+                    target_name = f"Unknown {row['target']} target"
+                process_time = time_s[window]
+                pressure = pressure_pa[window]
+                repetition_rate = step_mean(frequency_hz[window])
+                mean_laser_energy = step_mean(laser_energy_j[window], ignore_zeros=True)
+                if attenuated_laser_energy is None or np.isnan(mean_laser_energy):
                     attenuation = 1
                 else:
-                    attenuation = self.attenuated_laser_energy / (
-                        mean_laser_energy * 1e-3
-                    )
+                    attenuation = attenuated_laser_energy / mean_laser_energy
                 creates_new_thin_film = row["pulses"] > 0
                 evaporation_source = PLDLaser(
                     power=SourcePower(
-                        power=(
-                            data["laser_energy_mj"]
-                            * 1e-3
-                            * data["frequency_hz"]
-                            * attenuation
-                        ),
-                        process_time=data["time_s"],
+                        power=laser_power_w[window] * attenuation,
+                        process_time=process_time,
                     ),
                     wavelength=248e-9,
-                    repetition_rate=data["frequency_hz"].mean(),
+                    repetition_rate=repetition_rate,
                     spot_size=self.laser_spot_size.magnitude,
                     pulses=row["pulses"],
                 )
@@ -956,27 +1180,19 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
                 )
                 environment = ChamberEnvironment(
                     pressure=Pressure(
-                        pressure=data["pressure_mbar"],
-                        process_time=data["time_s"],
+                        pressure=pressure,
+                        process_time=process_time,
                     ),
                     gas_flow=[
                         GasFlow(
-                            gas=PubChemPureSubstanceSection(pub_chem_cid=977),
-                            flow=ureg.Quantity(
-                                data["o2_flow_sccm"].values, ureg("cm ** 3 / minute")
-                            )
-                            .to("meter ** 3 / second")
-                            .magnitude,
-                            process_time=data["time_s"],
+                            gas=IKZPLDPubChemSubstance(pub_chem_cid=977),
+                            flow=o2_flow[window],
+                            process_time=process_time,
                         ),
                         GasFlow(
                             gas=PureSubstanceSection(name="Argon/Nitrogen"),
-                            flow=ureg.Quantity(
-                                data["n2_ar_flow_sccm"].values, ureg("cm ** 3 / minute")
-                            )
-                            .to("meter ** 3 / second")
-                            .magnitude,
-                            process_time=data["time_s"],
+                            flow=n2_ar_flow[window],
+                            process_time=process_time,
                         ),
                     ],
                 )
@@ -1003,19 +1219,12 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
                             name=name,
                             elemental_composition=elemental_composition,
                             process_conditions=IKZPLDLayerProcessConditions(
-                                growth_temperature=data["temperature_degc"].mean()
-                                + 273.15,
-                                pressure=ureg.Quantity(
-                                    data["pressure_mbar"].mean(), ureg("mbar")
-                                )
-                                .to("pascal")
-                                .magnitude,
+                                growth_temperature=step_mean(temperature_k[window]),
+                                pressure=step_mean(pressure),
                                 sample_to_target_distance=target_distance,
                                 number_of_pulses=row["pulses"],
-                                laser_repetition_rate=data["frequency_hz"].mean(),
-                                laser_energy=self.attenuated_laser_energy.to(
-                                    "joule"
-                                ).magnitude,
+                                laser_repetition_rate=repetition_rate,
+                                laser_energy=attenuated_laser_energy,
                             ),
                             geometry=geometry,
                         ),
@@ -1025,8 +1234,8 @@ class IKZPulsedLaserDeposition(PulsedLaserDeposition, PlotSection, EntryData):
                     layers[name] = thin_film
                 substrate = PVDSampleParameters(
                     temperature=SubstrateTemperature(
-                        temperature=data["temperature_degc"] + 273.15,
-                        process_time=data["time_s"],
+                        temperature=temperature_k[window],
+                        process_time=process_time,
                         measurement_type="Heater thermocouple",
                     ),
                     heater="Resistive element",
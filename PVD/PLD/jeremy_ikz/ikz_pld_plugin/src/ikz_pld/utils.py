@@ -0,0 +1,439 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from nomad.datamodel.datamodel import (
+        EntryArchive,
+    )
+    from structlog.stdlib import (
+        BoundLogger,
+    )
+
+
+PUBCHEM_CACHE_PATH = os.environ.get(
+    "IKZ_PLD_PUBCHEM_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ikz_pld", "pubchem.sqlite"),
+)
+PUBCHEM_CACHE_FALLBACK_PATH = os.path.join(
+    tempfile.gettempdir(), "ikz_pld", "pubchem.sqlite"
+)
+PUBCHEM_CACHE_TTL = 30 * 24 * 3600
+PUBCHEM_MISS_TTL = 3600
+PUBCHEM_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=64)
+def unit_conversion(source: str, target: str) -> Tuple[float, float]:
+    """
+    Function for resolving the conversion between two units once. The conversion is
+    returned as scale and offset, so that `value_target = scale * value_source +
+    offset`, which also covers offset units like degree Celsius.
+
+    Args:
+        source (str): The unit of the values, e.g. "cm ** 3 / minute".
+        target (str): The unit to convert to, e.g. "meter ** 3 / second".
+
+    Returns:
+        Tuple[float, float]: The scale and the offset of the conversion.
+    """
+    from nomad.units import ureg
+
+    offset = ureg.Quantity(0.0, source).to(target).magnitude
+    scale = ureg.Quantity(1.0, source).to(target).magnitude - offset
+    return float(scale), float(offset)
+
+
+def convert_units(
+    values: Union[float, np.ndarray], source: str, target: str
+) -> Union[float, np.ndarray]:
+    """
+    Function for converting plain values or whole arrays between two units without
+    creating pint quantities. The conversion is looked up in the cache of
+    `unit_conversion`.
+
+    Args:
+        values (Union[float, np.ndarray]): The values in the `source` unit.
+        source (str): The unit of the values.
+        target (str): The unit to convert to.
+
+    Returns:
+        Union[float, np.ndarray]: The values in the `target` unit.
+    """
+    scale, offset = unit_conversion(source, target)
+    if isinstance(values, np.ndarray):
+        values = values.astype(np.float64, copy=False)
+    if offset:
+        return values * scale + offset
+    return values * scale
+
+
+def step_mean(values: np.ndarray, ignore_zeros: bool = False) -> float:
+    """
+    Function for averaging the log values of a step. Like the pandas mean, NaN gaps
+    in the log are skipped and NaN is returned if no value is left.
+
+    Args:
+        values (np.ndarray): The log values of the step.
+        ignore_zeros (bool): Whether zeros are skipped as well.
+
+    Returns:
+        float: The mean of the remaining values.
+    """
+    valid = ~np.isnan(values)
+    if ignore_zeros:
+        valid &= values != 0
+    count = np.count_nonzero(valid)
+    if not count:
+        return np.nan
+    return float(values.sum(where=valid) / count)
+
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Function for decimating a time series to at most `max_points` points while
+    keeping its peaks. The series is split into buckets of equal length and the
+    minimum and the maximum of every bucket are kept, together with the first and
+    the last point.
+
+    Args:
+        values (np.ndarray): The values of the series.
+        max_points (int): The maximum number of points to keep, at least 4.
+
+    Returns:
+        np.ndarray: The sorted indices of the kept points.
+    """
+    length = len(values)
+    if length <= max_points:
+        return np.arange(length)
+    buckets = max(1, (max_points - 2) // 2)
+    size = -(-length // buckets)
+    padded = np.pad(values, (0, buckets * size - length), mode="edge")
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    indices = np.concatenate(
+        (
+            [0, length - 1],
+            offsets + np.argmin(padded, axis=1),
+            offsets + np.argmax(padded, axis=1),
+        )
+    )
+    return np.unique(np.minimum(indices, length - 1))
+
+
+def point_budgets(lengths: List[int], max_points: int) -> List[int]:
+    """
+    Function for sharing a budget of `max_points` points between several series in
+    proportion to their length. One point per series is left for the gap drawn
+    between the series. Every series gets at least 4 points, as needed by
+    `minmax_indices`, but never more than it has.
+
+    Args:
+        lengths (List[int]): The lengths of the series.
+        max_points (int): The maximum total number of points, including the gaps.
+
+    Returns:
+        List[int]: The number of points of every series.
+    """
+    total = sum(lengths)
+    if not total:
+        return [0 for _ in lengths]
+    return [
+        min(length, max(4, max_points * length // total - 1)) for length in lengths
+    ]
+
+
+def create_archives(
+    entries: Dict[str, Dict[str, Any]],
+    archive: "EntryArchive",
+    logger: "BoundLogger" = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Function for creating several entries in the upload of `archive` at once. All
+    files are written first and the processing of the new files is triggered
+    afterwards in one go. Files that already exist are not overwritten, like in
+    `create_archive` of `nomad_material_processing.utils`, and are logged.
+
+    Args:
+        entries (Dict[str, Dict[str, Any]]): The serialized data section of every
+            entry, e.g. from `m_to_dict(with_root_def=True)`, by file name. The
+            dictionaries may share nested structures.
+        archive (EntryArchive): The archive of the entry creating the entries.
+        logger (BoundLogger, optional): A structlog logger. Defaults to None.
+
+    Returns:
+        Dict[str, Optional[str]]: The reference to the data section of every entry
+        by file name, `None` if entries cannot be created in the current context.
+    """
+    from nomad.datamodel.context import ClientContext
+    from nomad_material_processing.utils import (
+        get_entry_id_from_file_name,
+        get_reference,
+    )
+
+    if isinstance(archive.m_context, ClientContext):
+        return {file_name: None for file_name in entries}
+    created = []
+    skipped = []
+    for file_name, data in entries.items():
+        if archive.m_context.raw_path_exists(file_name):
+            skipped.append(file_name)
+            continue
+        with archive.m_context.raw_file(file_name, "w") as outfile:
+            json.dump({"data": data}, outfile)
+        created.append(file_name)
+    if skipped and logger is not None:
+        logger.info(
+            f"Kept {len(skipped)} existing files instead of creating them: "
+            f"{', '.join(skipped)}"
+        )
+    for file_name in created:
+        archive.m_context.process_updated_raw_file(file_name)
+    return {
+        file_name: get_reference(
+            archive.metadata.upload_id,
+            get_entry_id_from_file_name(file_name, archive),
+        )
+        for file_name in entries
+    }
+
+
+class CachedSubstance(NamedTuple):
+    """
+    A substance found in the `PubChemCache`.
+    """
+
+    data: Dict[str, Any]
+    fresh: bool
+
+
+def pubchem_cache_keys(
+    pub_chem_cid: Optional[int] = None, name: Optional[str] = None
+) -> Tuple[str, ...]:
+    """
+    Function for getting the keys of a substance in the `PubChemCache`, first by
+    PubChem CID and then by name.
+
+    Args:
+        pub_chem_cid (Optional[int]): The PubChem CID of the substance.
+        name (Optional[str]): The name of the substance.
+
+    Returns:
+        Tuple[str, ...]: The cache keys of the substance.
+    """
+    keys = []
+    if pub_chem_cid:
+        keys.append(f"cid:{pub_chem_cid}")
+    if name and name.strip():
+        keys.append(f"name:{' '.join(name.lower().split())}")
+    return tuple(keys)
+
+
+class PubChemCache:
+    """
+    A persistent cache of PubChem substance data in an SQLite file, shared by all
+    processes on a node. Entries older than `ttl` seconds are stale: they are only
+    returned as a fallback if PubChem cannot be reached, e.g. on isolated processing
+    nodes. Failed lookups are remembered for `miss_ttl` seconds, so that unknown
+    substances or an unreachable PubChem are not queried on every normalization. At
+    most `max_entries` entries are kept, the least recently used ones are evicted
+    first. If the cache file cannot be opened, the cache moves to `fallback_path`
+    and, if that fails too, is disabled. Errors of the cache file are logged and
+    treated as misses.
+    """
+
+    def __init__(
+        self,
+        path: str = PUBCHEM_CACHE_PATH,
+        ttl: float = PUBCHEM_CACHE_TTL,
+        max_entries: int = PUBCHEM_CACHE_SIZE,
+        miss_ttl: float = PUBCHEM_MISS_TTL,
+        fallback_path: Optional[str] = PUBCHEM_CACHE_FALLBACK_PATH,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.miss_ttl = miss_ttl
+        self.fallback_path = fallback_path
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS substances ("
+                    "key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                    "stored REAL NOT NULL, used REAL NOT NULL)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS misses ("
+                    "key TEXT PRIMARY KEY, stored REAL NOT NULL)"
+                )
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        paths = [self.path]
+        if self.fallback_path and self.fallback_path != self.path:
+            paths.append(self.fallback_path)
+        for path in paths:
+            try:
+                connection = self._open(path)
+            except (OSError, sqlite3.Error):
+                if path == paths[-1]:
+                    self.path = None
+                    raise
+                continue
+            self.path = path
+            break
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key: str, logger: "BoundLogger" = None) -> Optional[CachedSubstance]:
+        """
+        Returns the cached data of the substance with the `key` or `None` if it is
+        not cached.
+        """
+        if self.path is None:
+            return None
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                row = connection.execute(
+                    "SELECT data, stored FROM substances WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute(
+                    "UPDATE substances SET used = ? WHERE key = ?", (now, key)
+                )
+        except (OSError, sqlite3.Error) as e:
+            if logger is not None:
+                logger.warning(f"Could not read the PubChem cache: {e}")
+            return None
+        data, stored = row
+        return CachedSubstance(data=json.loads(data), fresh=now - stored < self.ttl)
+
+    def put(
+        self, keys: Tuple[str, ...], data: Dict[str, Any], logger: "BoundLogger" = None
+    ) -> None:
+        """
+        Stores the data of a substance under all its `keys` and evicts the least
+        recently used entries beyond `max_entries`.
+        """
+        if self.path is None:
+            return
+        now = time.time()
+        serialized = json.dumps(data)
+        try:
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO substances VALUES (?, ?, ?, ?)",
+                    [(key, serialized, now, now) for key in keys],
+                )
+                connection.executemany(
+                    "DELETE FROM misses WHERE key = ?", [(key,) for key in keys]
+                )
+                connection.execute(
+                    "DELETE FROM substances WHERE key NOT IN ("
+                    "SELECT key FROM substances ORDER BY used DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+        except (OSError, sqlite3.Error) as e:
+            if logger is not None:
+                logger.warning(f"Could not write the PubChem cache: {e}")
+
+    def missed(self, key: str, logger: "BoundLogger" = None) -> bool:
+        """
+        Returns whether the lookup of the substance with the `key` failed less than
+        `miss_ttl` seconds ago.
+        """
+        if self.path is None:
+            return False
+        try:
+            with self._connect() as connection:
+                row = connection.execute(
+                    "SELECT stored FROM misses WHERE key = ?", (key,)
+                ).fetchone()
+        except (OSError, sqlite3.Error) as e:
+            if logger is not None:
+                logger.warning(f"Could not read the PubChem cache: {e}")
+            return False
+        return row is not None and time.time() - row[0] < self.miss_ttl
+
+    def put_miss(self, keys: Tuple[str, ...], logger: "BoundLogger" = None) -> None:
+        """
+        Remembers a failed lookup of the substance with the `keys` and removes the
+        expired misses.
+        """
+        if self.path is None:
+            return
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO misses VALUES (?, ?)",
+                    [(key, now) for key in keys],
+                )
+                connection.execute(
+                    "DELETE FROM misses WHERE stored < ?", (now - self.miss_ttl,)
+                )
+        except (OSError, sqlite3.Error) as e:
+            if logger is not None:
+                logger.warning(f"Could not write the PubChem cache: {e}")
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the cache.
+        """
+        if self.path is None:
+            return
+        with self._connect() as connection:
+            connection.execute("DELETE FROM substances")
+            connection.execute("DELETE FROM misses")
@@ -1,7 +1,19 @@
 import os.path
 import glob
+import io
+
+import numpy as np
+import pytest
+import requests
 
 from nomad.client import parse, normalize_all
+from nomad.datamodel import EntryArchive
+from nomad.datamodel.metainfo.basesections import PubChemPureSubstanceSection
+from nomad.utils import get_logger
+
+from ikz_pld import schema
+from ikz_pld.schema import DLOG_DTYPE, read_dlog, read_elog, step_slices
+from ikz_pld.utils import PubChemCache, pubchem_cache_keys
 
 def test_schema():
     test_files = glob.glob(os.path.join(os.path.dirname(__file__), 'data', '*.archive.yaml'))
@@ -11,3 +23,65 @@ def test_schema():
         print(f'{test_file = }')
         print(entry_archive.m_pretty_print())
         print()
+
+
+def test_read_dlog():
+    test_file = os.path.join(
+        os.path.dirname(__file__), 'data', '26042023_1630-STO-SAO-STO-Alev.dlog'
+    )
+    dlog = read_dlog(test_file)
+    assert dlog.dtype.names == DLOG_DTYPE.names
+    assert len(dlog) == 7626
+    assert dlog['time_s'][0] == 15.2
+    assert dlog['pressure1_mbar'][-1] == np.float32(184.1)
+
+
+def test_step_slices():
+    time = np.array([0, 1, 1, 2, 3, 3, 4, 5], dtype=float)
+    starts = np.array([1, 3])
+    durations = np.array([2, 2])
+    for window, start, duration in zip(
+        step_slices(time, starts, durations), starts, durations
+    ):
+        mask = (start <= time) & (time < start + duration)
+        assert np.array_equal(time[window], time[mask])
+
+
+def test_read_elog():
+    test_file = os.path.join(
+        os.path.dirname(__file__), 'data', '26042023_1630-STO-SAO-STO-Alev.elog'
+    )
+    steps, end_time = read_elog(test_file)
+    assert end_time == 16161
+    assert len(steps) == 8
+    assert steps[3]['recipe'] == 'depoSAO700'
+    assert (steps[3]['time_s'], steps[3]['duration_s']) == (4068, 174)
+    assert steps['pulses'].tolist() == [0, 0, 0, 330, 0, 300, 0, 0]
+    assert (steps[5]['target'], steps[5]['temperature']) == ('STO', '700')
+
+    with open(test_file) as fh:
+        lines = fh.read().splitlines()
+    malformed = '\n'.join(lines[:3] + lines[4:] + ['4:30:0\tShutting down system'])
+    with pytest.raises(ValueError, match='Line 4 of the elog'):
+        read_elog(io.StringIO(malformed))
+
+
+def test_pubchem_substance_offline(tmp_path, monkeypatch):
+    cache = PubChemCache(path=str(tmp_path / 'pubchem.sqlite'), ttl=0)
+    cache.put(
+        pubchem_cache_keys(name='argon'), {'name': 'argon', 'molecular_formula': 'Ar'}
+    )
+    monkeypatch.setattr(schema, 'pubchem_cache', cache)
+    lookups = []
+
+    def find_cid(self, logger):
+        lookups.append(self.name)
+        raise requests.exceptions.ConnectionError('PubChem is not reachable')
+
+    monkeypatch.setattr(PubChemPureSubstanceSection, '_find_cid', find_cid)
+    for _ in range(2):
+        substance = schema.IKZPLDPubChemSubstance(name='argon')
+        substance.normalize(EntryArchive(), get_logger(__name__))
+        assert substance.molecular_formula == 'Ar'
+    assert lookups == ['argon']
+    assert cache.missed('name:argon')
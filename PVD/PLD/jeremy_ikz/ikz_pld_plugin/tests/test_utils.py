@@ -0,0 +1,165 @@
+import io
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from ikz_pld.utils import (
+    PubChemCache,
+    convert_units,
+    create_archives,
+    minmax_indices,
+    point_budgets,
+    pubchem_cache_keys,
+    step_mean,
+    unit_conversion,
+)
+
+
+def test_convert_units():
+    flow = convert_units(
+        np.array([0.0, 60.0]), 'cm ** 3 / minute', 'meter ** 3 / second'
+    )
+    assert np.allclose(flow, [0.0, 1e-6])
+    assert np.allclose(convert_units(np.float32(25.1), 'celsius', 'kelvin'), 298.25)
+    assert convert_units(1.5, 'mbar', 'pascal') == 150.0
+    assert unit_conversion('mbar', 'pascal') is unit_conversion('mbar', 'pascal')
+
+
+def test_step_mean():
+    values = np.array([np.nan, 2.0, 0.0, np.nan, 4.0])
+    assert step_mean(values) == 2.0
+    assert step_mean(values, ignore_zeros=True) == 3.0
+    assert np.isnan(step_mean(np.array([np.nan, 0.0]), ignore_zeros=True))
+    assert np.isnan(step_mean(np.empty(0)))
+
+
+def test_minmax_indices():
+    values = np.sin(np.linspace(0, 20, 10000))
+    values[1234] = 5.0
+    values[4321] = -5.0
+    indices = minmax_indices(values, 100)
+    assert len(indices) <= 100
+    assert indices[0] == 0
+    assert indices[-1] == len(values) - 1
+    assert {1234, 4321} <= set(indices.tolist())
+    assert np.all(np.diff(indices) > 0)
+    assert len(minmax_indices(values[:50], 100)) == 50
+
+
+def test_point_budgets():
+    lengths = [5000, 2000, 3000]
+    budgets = point_budgets(lengths, 2000)
+    assert sum(budgets) + len(lengths) <= 2000
+    assert budgets[0] > budgets[2] > budgets[1]
+    assert point_budgets([10000, 10], 2000) == [1997, 4]
+    assert point_budgets([3, 50], 2000) == [3, 50]
+    assert point_budgets([0, 0], 2000) == [0, 0]
+
+    values = [np.sin(np.linspace(0, 20, length)) for length in lengths]
+    kept = [minmax_indices(v, b) for v, b in zip(values, budgets)]
+    assert all(len(k) <= b for k, b in zip(kept, budgets))
+    assert all(
+        v[k].max() == v.max() and v[k].min() == v.min() for v, k in zip(values, kept)
+    )
+
+
+class UploadContext:
+    """
+    A stand-in for the server context of an upload with the raw files in memory.
+    """
+
+    def __init__(self, files):
+        self.files = dict(files)
+        self.processed = []
+
+    def raw_path_exists(self, path):
+        return path in self.files
+
+    @contextmanager
+    def raw_file(self, path, mode='r'):
+        fh = io.StringIO()
+        yield fh
+        self.files[path] = fh.getvalue()
+
+    def process_updated_raw_file(self, path):
+        self.processed.append(path)
+
+
+def test_create_archives():
+    context = UploadContext({'existing.archive.json': 'edited'})
+    archive = EntryArchive(metadata=EntryMetadata(upload_id='upload'))
+    archive.m_context = context
+    messages = []
+    logger = SimpleNamespace(info=messages.append)
+    data = {'m_def': 'ikz_pld.schema.IKZPLDSubstrate', 'name': 'substrate'}
+
+    references = create_archives(
+        {'new.archive.json': data, 'existing.archive.json': data}, archive, logger
+    )
+    assert list(references) == ['new.archive.json', 'existing.archive.json']
+    assert all(
+        reference.startswith('../uploads/upload/archive/')
+        for reference in references.values()
+    )
+    assert json.loads(context.files['new.archive.json']) == {'data': data}
+    assert context.files['existing.archive.json'] == 'edited'
+    assert context.processed == ['new.archive.json']
+    assert len(messages) == 1
+    assert 'existing.archive.json' in messages[0]
+
+
+def test_pubchem_cache(tmp_path):
+    cache = PubChemCache(path=str(tmp_path / 'pubchem.sqlite'), max_entries=2)
+    keys = pubchem_cache_keys(977, ' Molecular  Oxygen')
+    assert keys == ('cid:977', 'name:molecular oxygen')
+    assert cache.get('cid:977') is None
+
+    cache.put(keys, {'pub_chem_cid': 977, 'molecular_formula': 'O2'})
+    cached = cache.get('name:molecular oxygen')
+    assert cached.fresh
+    assert cached.data['molecular_formula'] == 'O2'
+
+    cache.ttl = 0
+    assert not cache.get('cid:977').fresh
+
+    cache.put(pubchem_cache_keys(name='argon'), {'name': 'argon'})
+    assert cache.get('name:argon') is not None
+    assert cache.get('name:molecular oxygen') is None
+
+
+def test_pubchem_cache_misses(tmp_path):
+    cache = PubChemCache(path=str(tmp_path / 'pubchem.sqlite'))
+    keys = pubchem_cache_keys(name='unobtainium')
+    assert not cache.missed('name:unobtainium')
+
+    cache.put_miss(keys)
+    assert cache.missed('name:unobtainium')
+    cache.miss_ttl = 0
+    assert not cache.missed('name:unobtainium')
+
+    cache.miss_ttl = 3600
+    cache.put_miss(keys)
+    cache.put(keys, {'name': 'unobtainium'})
+    assert not cache.missed('name:unobtainium')
+
+
+def test_pubchem_cache_fallback(tmp_path):
+    blocked = tmp_path / 'blocked'
+    blocked.write_text('not a directory')
+    fallback = str(tmp_path / 'fallback' / 'pubchem.sqlite')
+    cache = PubChemCache(path=str(blocked / 'pubchem.sqlite'), fallback_path=fallback)
+    cache.put(pubchem_cache_keys(name='argon'), {'name': 'argon'})
+    assert cache.path == fallback
+    assert cache.get('name:argon').data == {'name': 'argon'}
+
+    cache = PubChemCache(
+        path=str(blocked / 'pubchem.sqlite'),
+        fallback_path=str(blocked / 'fallback.sqlite'),
+    )
+    cache.put(pubchem_cache_keys(name='argon'), {'name': 'argon'})
+    assert cache.path is None
+    assert cache.get('name:argon') is None
+    assert not cache.missed('name:argon')
@@ -0,0 +1,116 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+'''
+Compares `hzb_unold_lab.reader.read_log_file` with the header loop and the
+`pd.read_csv` call previously used in `HZBUnoldLabThermalEvaporation.normalize` on a
+24 h log, which is generated by repeating the rows of the test log file.
+
+Usage:
+    python benchmarks/benchmark_reader.py [--hours 24] [--repeat 3]
+'''
+
+import argparse
+import os
+import tempfile
+import timeit
+
+import pandas as pd
+
+from hzb_unold_lab.reader import is_process_column, read_log_file
+
+TEST_FILE = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'data', 'hzb-unold-lab_pvdp-2135.tsv'
+)
+
+
+def legacy_read(path: str):
+    with open(path) as fh:
+        line = fh.readline().strip()
+        metadata = {}
+        while line.startswith('#'):
+            if ':' in line:
+                key = line.split(':')[0][1:].strip()
+                value = str.join(':', line.split(':')[1:]).strip()
+                metadata[key] = value
+            line = fh.readline().strip()
+        df = pd.read_csv(fh, sep='\t')
+    return metadata, df
+
+
+def write_log(path: str, hours: float) -> int:
+    with open(TEST_FILE) as fh:
+        lines = fh.readlines()
+    body_start = next(
+        idx for idx, line in enumerate(lines) if line.startswith('Time\t')
+    ) + 1
+    header, body = lines[:body_start], lines[body_start:]
+    n_rows = int(hours * 3600)
+    with open(path, 'w') as fh:
+        fh.writelines(header)
+        for row in range(n_rows):
+            fields = body[row % len(body)].split('\t', 2)
+            seconds = row % 86400
+            clock = f'{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+            fh.write(f'{clock}\t{row}\t{fields[2]}')
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'hzb-unold-lab_pvdp-benchmark.tsv')
+        n_rows = write_log(path, args.hours)
+
+        _, legacy_df = legacy_read(path)
+        with open(path) as fh:
+            log = read_log_file(fh)
+        assert list(log.data.columns) == list(legacy_df.columns)
+        assert len(log.data) == len(legacy_df) == n_rows
+
+        def run_reader():
+            with open(path) as fh:
+                read_log_file(fh)
+
+        def run_process_reader():
+            with open(path) as fh:
+                read_log_file(fh, columns=is_process_column)
+
+        legacy_time = min(
+            timeit.repeat(lambda: legacy_read(path), number=1, repeat=args.repeat)
+        )
+        reader_time = min(timeit.repeat(run_reader, number=1, repeat=args.repeat))
+        process_time = min(
+            timeit.repeat(run_process_reader, number=1, repeat=args.repeat)
+        )
+
+    print(f'{n_rows} rows x {len(log.data.columns)} columns')
+    print(f'legacy read:   {legacy_time * 1e3:9.1f} ms')
+    print(f'read_log_file: {reader_time * 1e3:9.1f} ms')
+    print(f'speedup:       {legacy_time / reader_time:9.1f}x')
+    print(f'process columns only: {process_time * 1e3:9.1f} ms')
+    print(f'speedup:              {legacy_time / process_time:9.1f}x')
+    print(f'memory legacy: {legacy_df.memory_usage(deep=True).sum() / 2**20:9.1f} MiB')
+    print(f'memory reader: {log.data.memory_usage(deep=True).sum() / 2**20:9.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,7 @@ from nomad.datamodel.data import (
 )
 
 from nomad_material_processing.utils import create_archive
+from hzb_unold_lab.reader import read_log_header
 from hzb_unold_lab.schema import HZBUnoldLabThermalEvaporation
 
 
@@ -54,6 +55,10 @@ class PVDPParser(MatchingParser):
     def parse(self, mainfile: str, archive: EntryArchive, logger) -> None:
         log_file = mainfile.split("/")[-1]
         entry = HZBUnoldLabThermalEvaporation(log_file=log_file)
+        with open(mainfile) as fh:
+            header = read_log_header(fh)
+        if header.process_id:
+            entry.name = f"PVD-{header.process_id}"
         file_name = f"{log_file[:-4]}.archive.json"
         archive.data = PVDPLogFile(process=create_archive(entry, archive, file_name))
         archive.metadata.entry_name = log_file[:-4] + " log file"
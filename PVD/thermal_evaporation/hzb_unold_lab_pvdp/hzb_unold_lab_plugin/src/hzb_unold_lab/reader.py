@@ -0,0 +1,191 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import datetime
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN = 'Time'
+PROCESS_TIME_COLUMN = 'Process Time in seconds'
+PROCESS_COLUMN_PATTERN = re.compile(
+    r'^(Time|Process Time in seconds|\d+ - \S+ (Aout|PV|T)|QCM\d (FILMNAM|SHTSRC)_\d'
+    r'|Substrate PV|Vacuum Pressure2)$'
+)
+HEADER_FIELDS = {
+    'Date': 'date',
+    'Time': 'time',
+    'Controller settings': 'controller_settings',
+    'Recipe': 'recipe',
+    'Substrate Number': 'substrate_number',
+    'process ID': 'process_id',
+    'operator': 'operator',
+}
+
+
+@dataclass
+class HZBUnoldLabLogHeader:
+    '''
+    The metadata in the `#` header of a log file of the HZB Unold lab PVD software.
+    '''
+    version: Optional[str] = None
+    date: Optional[datetime.date] = None
+    time: Optional[datetime.time] = None
+    controller_settings: Optional[str] = None
+    recipe: Optional[str] = None
+    substrate_number: Optional[str] = None
+    process_id: Optional[str] = None
+    operator: Optional[str] = None
+    values: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class HZBUnoldLabLog:
+    '''
+    The header and the tab separated body of a log file.
+    '''
+    header: HZBUnoldLabLogHeader
+    data: pd.DataFrame
+
+
+def is_process_column(name: str) -> bool:
+    '''
+    Whether the column `name` is used for the steps of a
+    `HZBUnoldLabThermalEvaporation`: the time columns, the power, rate and
+    temperature of every source, the QCM film names and shutters, the substrate
+    temperature and the chamber pressure.
+    '''
+    return PROCESS_COLUMN_PATTERN.match(name) is not None
+
+
+def column_dtype(name: str):
+    '''
+    Returns the dtype used for parsing the column `name`. The clock time is kept as
+    string and the process time as float64. Every other column is a sensor or
+    controller reading with less than 7 significant digits and is parsed as float32.
+    '''
+    if name == TIME_COLUMN:
+        return object
+    if name == PROCESS_TIME_COLUMN:
+        return np.float64
+    return np.float32
+
+
+def parse_log_header(header_lines: List[str]) -> HZBUnoldLabLogHeader:
+    '''
+    Parses the `#` header lines of a log file. `# <key>: <value>` lines are collected
+    in `values` and the known keys are converted to typed fields. The first line
+    without a key holds the file format version, `##...` lines are section markers.
+
+    Args:
+        header_lines (List[str]): The header lines.
+
+    Returns:
+        HZBUnoldLabLogHeader: The typed metadata of the header.
+    '''
+    header = HZBUnoldLabLogHeader()
+    for line in header_lines:
+        if line.startswith('##'):
+            # section markers like `########## start Header ##########`
+            continue
+        content = line.lstrip('#').strip()
+        key, separator, value = content.partition(':')
+        if separator:
+            header.values[key.strip()] = value.strip()
+        elif content and header.version is None:
+            header.version = content
+    for key, attribute in HEADER_FIELDS.items():
+        value = header.values.get(key)
+        if value:
+            setattr(header, attribute, value)
+    if header.date:
+        header.date = datetime.datetime.strptime(header.date, r'%Y/%m/%d').date()
+    if header.time:
+        header.time = datetime.datetime.strptime(header.time, r'%H:%M:%S').time()
+    return header
+
+
+def read_header_lines(file: TextIO) -> Tuple[List[str], str]:
+    '''
+    Reads the `#` header lines at the start of a log file.
+
+    Args:
+        file (TextIO): An open text handle of the log file.
+
+    Returns:
+        Tuple[List[str], str]: The stripped header lines and the first stripped line
+        after them.
+    '''
+    header_lines = []
+    line = file.readline().strip()
+    while line.startswith('#'):
+        header_lines.append(line)
+        line = file.readline().strip()
+    return header_lines, line
+
+
+def read_log_header(file: TextIO) -> HZBUnoldLabLogHeader:
+    '''
+    Reads only the header of a log file, see `parse_log_header`.
+
+    Args:
+        file (TextIO): An open text handle of the log file.
+
+    Returns:
+        HZBUnoldLabLogHeader: The typed metadata of the header.
+    '''
+    return parse_log_header(read_header_lines(file)[0])
+
+
+def read_log_file(
+    file: TextIO, columns: Optional[Callable[[str], bool]] = None
+) -> HZBUnoldLabLog:
+    '''
+    Reads a log file of the HZB Unold lab PVD software. The header is parsed into a
+    `HZBUnoldLabLogHeader` and the body is read by the C engine of `pd.read_csv`
+    with an explicit dtype for every column, so no type inference is done.
+
+    Args:
+        file (TextIO): An open text handle of the log file.
+        columns (Optional[Callable[[str], bool]]): Selects the columns to convert by
+            name, e.g. `is_process_column`. All columns are read if not given.
+
+    Returns:
+        HZBUnoldLabLog: The header and the body of the log file.
+    '''
+    header_lines, line = read_header_lines(file)
+    while not line:
+        line = file.readline()
+        if not line:
+            raise ValueError('No column names found in the log file.')
+        line = line.strip()
+    # the rows end with a tab, which would add an unnamed empty column
+    names = [name.strip() for name in line.split('\t')]
+    data = pd.read_csv(
+        file,
+        sep='\t',
+        header=None,
+        names=names,
+        usecols=columns or range(len(names)),
+        dtype={name: column_dtype(name) for name in names},
+        engine='c',
+    )
+    return HZBUnoldLabLog(header=parse_log_header(header_lines), data=data)
@@ -33,6 +33,11 @@ from nomad_material_processing.physical_vapor_deposition import (
     ThermalEvaporationStep,
 )
 from nomad_material_processing.utils import create_archive
+from hzb_unold_lab.reader import is_process_column, read_log_file
+from hzb_unold_lab.utils import (
+    segment_steps,
+    step_window,
+)
 from structlog.stdlib import (
     BoundLogger,
 )
@@ -116,6 +121,17 @@ class HZBUnoldLabThermalEvaporation(ThermalEvaporation, EntryData):
             component='FileEditQuantity'
         ),
     )
+    preview_points = Quantity(
+        type=int,
+        description='''
+        The maximum number of points stored per time series of a step. The series
+        are decimated with a constant stride if the step has more points. All
+        points are stored if not set.
+        ''',
+        a_eln=ELNAnnotation(
+            component='NumberEditQuantity'
+        ),
+    )
 
     def normalize(self, archive, logger: BoundLogger) -> None:
         '''
@@ -128,29 +144,21 @@ class HZBUnoldLabThermalEvaporation(ThermalEvaporation, EntryData):
             logger (BoundLogger): A structlog logger.
         '''
         if self.log_file:
-            import pandas as pd
             import numpy as np
             with archive.m_context.raw_file(self.log_file, 'r') as fh:
-                line = fh.readline().strip()
-                metadata = {}
-                while line.startswith('#'):
-                    if ':' in line:
-                        key = line.split(':')[0][1:].strip()
-                        value = str.join(':', line.split(':')[1:]).strip()
-                        metadata[key] = value
-                    line = fh.readline().strip()
-                df = pd.read_csv(fh, sep='\t')
-            self.datetime = datetime.datetime.strptime(
-                f'{metadata["Date"]}T{df["Time"].values[0]}',
-                r'%Y/%m/%dT%H:%M:%S',
+                log = read_log_file(fh, columns=is_process_column)
+            header, df = log.header, log.data
+            self.datetime = datetime.datetime.combine(
+                header.date,
+                datetime.datetime.strptime(df['Time'].values[0], r'%H:%M:%S').time(),
             )
-            self.end_time = datetime.datetime.strptime(
-                f'{metadata["Date"]}T{df["Time"].values[-1]}',
-                r'%Y/%m/%dT%H:%M:%S',
+            self.end_time = datetime.datetime.combine(
+                header.date,
+                datetime.datetime.strptime(df['Time'].values[-1], r'%H:%M:%S').time(),
             )
-            self.name =  f'PVD-{metadata["process ID"]}'
+            self.name =  f'PVD-{header.process_id}'
             self.location = 'Berlin, Germany'
-            self.lab_id = f'HZB_{metadata["operator"]}_{self.datetime.strftime(r"%Y%m%d")}_PVD-{metadata["process ID"]}'
+            self.lab_id = f'HZB_{header.operator}_{self.datetime.strftime(r"%Y%m%d")}_PVD-{header.process_id}'
 
             source_materials = {column[0]: column.split()[2] for column in df.columns if column[-1:] == 'T'}
 
@@ -161,13 +169,8 @@ class HZBUnoldLabThermalEvaporation(ThermalEvaporation, EntryData):
             except KeyError:
                 raise ValueError("Film names do not match source names.")
             shutters = [f'{qcm[:-2]} SHTSRC{qcm[-2:]}' for qcm in qcms_ordered]
-            start_times = []
-            for shutter in shutters:
-                switch_times = df.loc[df[shutter].diff() != 0, 'Process Time in seconds'].values
-                for time in switch_times:
-                    if not any(abs(t - time) < 5 for t in start_times):
-                        start_times.append(time)
-            start_times.append(df.iloc[-1,1])
+            time = df['Process Time in seconds'].to_numpy()
+            segments = segment_steps(time, df[shutters].to_numpy())
             substances = {
                 source_nr: create_archive(
                     entity=HZBUnoldLabSubstance(
@@ -180,14 +183,23 @@ class HZBUnoldLabThermalEvaporation(ThermalEvaporation, EntryData):
                     file_name=f'{source_materials[source_nr]}_substance.archive.json',
                 ) for source_nr in source_materials
             }
+            # convert every column once, the steps get views of these arrays
+            source_columns = {}
+            for source_nr in source_materials:
+                source = f'{source_nr} - {source_materials[source_nr]}'
+                source_columns[source_nr] = dict(
+                    rate=1e-6 * df[f'{source} PV'].to_numpy(),
+                    temperature=df[f'{source} T'].to_numpy() + 273.15,
+                    power=df[f'{source} Aout'].to_numpy(),
+                )
+            substrate_temperature = df['Substrate PV'].to_numpy() + 273.15
+            pressure = df['Vacuum Pressure2'].to_numpy() * 1e2
             steps = []
             depositions = 0
-            for idx, time in enumerate(start_times[:-1]):
-                step = df.loc[
-                    (time <= df['Process Time in seconds'])
-                    & (df['Process Time in seconds'] < start_times[idx + 1])
-                ]
-                if step.loc[:, shutters].mode().any().any():
+            for idx, (start, stop, duration, deposition) in enumerate(zip(*segments)):
+                window = step_window(start, stop, self.preview_points)
+                step_time = time[window]
+                if deposition:
                     depositions += 1
                     name = f'deposition {depositions}'
                 elif idx == 0:
@@ -196,23 +208,23 @@ class HZBUnoldLabThermalEvaporation(ThermalEvaporation, EntryData):
                     name = 'post'
                 sources = []
                 for source_nr in source_materials:
-                    source = f'{source_nr} - {source_materials[source_nr]}'
+                    columns = source_columns[source_nr]
                     material_source = PVDMaterialSource(
                         material=substances[source_nr],
                         rate=PVDMaterialEvaporationRate(
-                            rate=1e-6 * step[f'{source} PV'],
-                            process_time=step['Process Time in seconds'],
+                            rate=columns['rate'][window],
+                            process_time=step_time,
                             measurement_type='Quartz Crystal Microbalance',
                         ),
                     )
                     evaporation_source = ThermalEvaporationHeater(
                         temperature=ThermalEvaporationHeaterTemperature(
-                            temperature=step[f'{source} T'] + 273.15,
-                            process_time=step['Process Time in seconds'],
+                            temperature=columns['temperature'][window],
+                            process_time=step_time,
                         ),
                         power=PVDSourcePower(
-                            power=step[f'{source} Aout'],
-                            process_time=step['Process Time in seconds']
+                            power=columns['power'][window],
+                            process_time=step_time
                         ),
                     )
                     thermal_evaporation_source = ThermalEvaporationSource(
@@ -224,8 +236,8 @@ class HZBUnoldLabThermalEvaporation(ThermalEvaporation, EntryData):
                 substrate = PVDSubstrate(
                     substrate=None,  # TODO: Add substrate
                     temperature=PVDSubstrateTemperature(
-                        temperature=step['Substrate PV'] + 273.15,
-                        process_time=step['Process Time in seconds'],
+                        temperature=substrate_temperature[window],
+                        process_time=step_time,
                         measurement_type='Heater thermocouple',
                     ),
                     heater='Resistive element',
@@ -235,14 +247,14 @@ class HZBUnoldLabThermalEvaporation(ThermalEvaporation, EntryData):
                 )
                 environment = PVDChamberEnvironment(
                     pressure=PVDPressure(
-                        pressure=step['Vacuum Pressure2'] * 1e2,
-                        process_time=step['Process Time in seconds'],
+                        pressure=pressure[window],
+                        process_time=step_time,
                     ),
                 )
                 step = ThermalEvaporationStep(
                     name=name,
-                    creates_new_thin_film=step.loc[:, shutters].mode().any().any(),
-                    duration=start_times[idx + 1] - time,
+                    creates_new_thin_film=bool(deposition),
+                    duration=duration,
                     sources=sources,
                     substrate=[substrate],
                     environment=environment,
@@ -0,0 +1,125 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+SWITCH_TOLERANCE = 5.0
+
+
+class StepSegments(NamedTuple):
+    '''
+    The row ranges `[starts[i], stops[i])` of the steps of a process log.
+    '''
+    starts: np.ndarray
+    stops: np.ndarray
+    durations: np.ndarray
+    deposition: np.ndarray
+
+
+def shutter_change_points(
+    time: np.ndarray,
+    shutter_states: np.ndarray,
+    tolerance: float = SWITCH_TOLERANCE,
+) -> np.ndarray:
+    '''
+    Finds the times at which any of the shutters switches. The first time of the log
+    is always included. Switches less than `tolerance` after the last kept switch are
+    merged into it.
+
+    Args:
+        time (np.ndarray): The increasing process time of every row.
+        shutter_states (np.ndarray): The `(rows, shutters)` array of shutter states.
+        tolerance (float): The time within which switches are merged.
+
+    Returns:
+        np.ndarray: The sorted change points.
+    '''
+    if not len(time):
+        return np.empty(0, dtype=time.dtype)
+    changed = np.empty(len(time), dtype=bool)
+    changed[0] = True
+    changed[1:] = (shutter_states[1:] != shutter_states[:-1]).any(axis=1)
+    points = time[changed]
+    # Compare with the last kept switch, not the previous raw one, so that a shutter
+    # toggling faster than `tolerance` is not chained into a single step.
+    kept = [points[0]]
+    for point in points[1:]:
+        if point - kept[-1] >= tolerance:
+            kept.append(point)
+    return np.asarray(kept, dtype=time.dtype)
+
+
+def segment_steps(
+    time: np.ndarray,
+    shutter_states: np.ndarray,
+    tolerance: float = SWITCH_TOLERANCE,
+) -> StepSegments:
+    '''
+    Splits a process log into steps at the shutter switches in a single vectorized
+    pass. The row range of every step is found with `searchsorted`, so the columns of
+    a step can be taken as views of the full columns.
+
+    A step is a deposition if the shutter of any source is open for at least half of
+    its rows.
+
+    Args:
+        time (np.ndarray): The increasing process time of every row.
+        shutter_states (np.ndarray): The `(rows, shutters)` array of shutter states,
+            where 0 is closed.
+        tolerance (float): The time within which switches are merged.
+
+    Returns:
+        StepSegments: The row ranges, durations and deposition flags of the steps.
+    '''
+    points = shutter_change_points(time, shutter_states, tolerance)
+    starts = np.searchsorted(time, points, side='left')
+    stops = np.append(starts[1:], len(time))
+    keep = stops > starts
+    starts, stops = starts[keep], stops[keep]
+    if not len(starts):
+        empty = np.empty(0, dtype=np.intp)
+        return StepSegments(empty, empty, np.empty(0), np.empty(0, dtype=bool))
+    durations = np.append(time[starts[1:]], time[-1]) - time[starts]
+    open_rows = np.add.reduceat(
+        (shutter_states != 0).astype(np.intp), starts, axis=0
+    )
+    closed_rows = (stops - starts)[:, np.newaxis] - open_rows
+    deposition = (open_rows >= closed_rows).any(axis=1)
+    return StepSegments(starts, stops, durations, deposition)
+
+
+def step_window(start: int, stop: int, max_points: Optional[int] = None) -> slice:
+    '''
+    Returns the slice selecting the rows `[start, stop)` of a step. If `max_points` is
+    given, the rows are decimated with a constant stride so that at most
+    `max_points` rows are selected. Slicing an array with it returns a view.
+
+    Args:
+        start (int): The first row of the step.
+        stop (int): The row after the last row of the step.
+        max_points (Optional[int]): The maximum number of selected rows.
+
+    Returns:
+        slice: The rows of the step.
+    '''
+    stride = 1
+    if max_points:
+        stride = max(1, -(-(stop - start) // max_points))
+    return slice(start, stop, stride)
@@ -0,0 +1,27 @@
+import datetime
+import os.path
+
+import numpy as np
+
+from hzb_unold_lab.reader import is_process_column, read_log_file
+
+
+def test_read_log_file():
+    test_file = os.path.join(
+        os.path.dirname(__file__), 'data', 'hzb-unold-lab_pvdp-2135.tsv'
+    )
+    with open(test_file) as fh:
+        log = read_log_file(fh)
+    assert log.header.version == 'PVD Measurementfile v3, 3.0.0'
+    assert log.header.date == datetime.date(2021, 8, 24)
+    assert log.header.process_id == '2135'
+    assert log.header.operator == 'kuv'
+    assert log.data['Process Time in seconds'].dtype == np.float64
+    assert log.data['1 - CsBr T'].dtype == np.float32
+    assert log.data['Time'].values[0] == '15:53:18'
+
+    with open(test_file) as fh:
+        process_log = read_log_file(fh, columns=is_process_column)
+    assert 'QCM1 SHTSRC_1' in process_log.data.columns
+    assert 'QCM1 XFREQ_1' not in process_log.data.columns
+    assert len(process_log.data) == len(log.data)
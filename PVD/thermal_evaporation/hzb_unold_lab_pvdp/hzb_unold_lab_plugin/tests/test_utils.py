@@ -0,0 +1,43 @@
+import numpy as np
+
+from hzb_unold_lab.utils import (
+    segment_steps,
+    step_window,
+)
+
+
+def test_segment_steps():
+    time = np.arange(100, dtype=float)
+    shutters = np.zeros((100, 2), dtype=int)
+    shutters[30:60, 0] = 1
+    shutters[32:60, 1] = 1  # second shutter opens within the tolerance
+    shutters[80:82, 1] = 1  # short toggle, mostly closed
+
+    segments = segment_steps(time, shutters)
+
+    assert segments.starts.tolist() == [0, 30, 60, 80]
+    assert segments.stops.tolist() == [30, 60, 80, 100]
+    assert segments.durations.tolist() == [30, 30, 20, 19]
+    assert segments.deposition.tolist() == [False, True, False, False]
+
+
+def test_segment_steps_fast_toggles():
+    time = np.arange(60, dtype=float)
+    shutters = np.zeros((60, 1), dtype=int)
+    for toggle in range(10, 28, 3):  # toggles every 3 s, within the tolerance
+        shutters[toggle:, 0] = 1 - shutters[toggle - 1, 0]
+
+    segments = segment_steps(time, shutters)
+
+    assert segments.starts.tolist() == [0, 10, 16, 22]
+    assert segments.durations.tolist() == [10, 6, 6, 37]
+
+
+def test_step_window():
+    column = np.arange(1000)
+    assert len(column[step_window(100, 350)]) == 250
+    preview = column[step_window(100, 350, max_points=100)]
+    assert len(preview) <= 100
+    assert preview[0] == 100
+    assert np.shares_memory(preview, column)
+
@@ -0,0 +1,179 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Compares `rtg_sims.reader.read_depth_profile` with the line by line parser that was
+previously defined inside `RTGSIMSMeasurement.normalize`.
+
+Usage:
+    python benchmarks/benchmark_reader.py [--elements 20] [--points 20000] [--files 200]
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import timeit
+
+import numpy as np
+
+from rtg_sims.reader import read_depth_profile, read_depth_profile_folder
+
+
+def legacy_parse(file):
+    data = file.readlines()
+    Zn_counter = 0
+    element = None
+    depth_profiles_qual = []
+    depth_profiles_quant = []
+    unit = None
+    sims_dict = {}
+    for line in data:
+        if 'DEPTH PROFILE :' in line:
+            depth_profile_id = (line.split(':')[1]).strip()
+            sims_dict = dict(depth_profile_id=depth_profile_id)
+        elif 'Date' in line:
+            date = (line.split(':')[1]).strip()
+            sims_dict.update(dict(date=date))
+        elif 'Matrix' in line:
+            matrix = (line.split(':')[1]).strip()
+            sims_dict.update(dict(Matrix=matrix))
+        elif 'Sample name' in line:
+            sample_id = (line.split(':')[1]).strip()
+            sims_dict.update(dict(sample_id=sample_id))
+        elif 'ELEMENT' in line:
+            element = (line.split('T ')[1]).strip('\n')
+            if element == 'Zn':
+                Zn_counter += 1
+                element += str(Zn_counter)
+        elif 'points' in line:
+            points = int(line.split(' points')[0])
+            points_counter = 0
+        elif '[c/s]' in line:
+            element_dict = dict(element=element, depth=[], intensity=[], unit=None)
+            unit = line.split('] ')[1].strip()
+            element_dict['unit'] = unit
+            depth_profile_type = 'qual'
+        elif '[Atom/cm3]' in line:
+            element_dict = dict(
+                element=element, depth=[], atomic_concentration=[], unit=None
+            )
+            unit = line.split('] ')[1].strip()
+            element_dict['unit'] = unit
+            depth_profile_type = 'quant'
+        elif 'E+' in line or 'E-' in line:
+            points_counter += 1
+            key = (
+                'intensity' if depth_profile_type == 'qual' else 'atomic_concentration'
+            )
+            element_dict['depth'].append(float(line.split('      ')[0].strip()))
+            element_dict[key].append(float(line.split('      ')[1].strip()))
+            if points_counter == points:
+                if depth_profile_type == 'qual':
+                    depth_profiles_qual.append(element_dict)
+                else:
+                    depth_profiles_quant.append(element_dict)
+                points_counter = 0
+                element_dict = {}
+    sims_dict.update(dict(depth_profiles_of_elements_qual=depth_profiles_qual))
+    sims_dict.update(dict(depth_profiles_of_elements_quant=depth_profiles_quant))
+    return sims_dict
+
+
+def write_profile(path: str, n_elements: int, n_points: int) -> None:
+    rng = np.random.default_rng(0)
+    depth = np.linspace(5e-3, 5, n_points)
+    with open(path, 'w', newline='\r\n') as fh:
+        fh.write('IMS CAMECA\n' + '*' * 54 + '\n')
+        fh.write('DEPTH PROFILE : benchmark.dp\n' + '*' * 54 + '\n\n')
+        fh.write('Date\t\t\t: 29.11.22   \nMatrix\t\t: (AlGa)2O3\n')
+        fh.write('Sample name\t\t: benchmark\n\n\n')
+        for idx in range(n_elements):
+            unit = '[c/s]' if idx % 2 == 0 else '[Atom/cm3]'
+            fh.write(f'ELEMENT {idx}Xx\n{n_points} points\n')
+            fh.write(f'[um]               {unit}\n')
+            values = rng.uniform(1e1, 1e20, n_points)
+            fh.writelines(f'{d:E}      {v:E}\n' for d, v in zip(depth, values))
+            fh.write('\n\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--elements', type=int, default=20)
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'benchmark.dp_ascii')
+        write_profile(path, args.elements, args.points)
+
+        with open(path) as fh:
+            legacy = legacy_parse(fh)
+        profile = read_depth_profile(path)
+        legacy_blocks = (
+            legacy['depth_profiles_of_elements_qual']
+            + legacy['depth_profiles_of_elements_quant']
+        )
+        assert len(legacy_blocks) == len(profile.blocks)
+        for block in profile.blocks:
+            match = next(b for b in legacy_blocks if b['element'] == block.element)
+            assert np.array_equal(match['depth'], block.depth)
+
+        def run_legacy():
+            with open(path) as fh:
+                legacy_parse(fh)
+
+        legacy_time = min(timeit.repeat(run_legacy, number=1, repeat=args.repeat))
+        reader_time = min(
+            timeit.repeat(
+                lambda: read_depth_profile(path), number=1, repeat=args.repeat
+            )
+        )
+
+        folder = os.path.join(tmp_dir, 'batch')
+        os.mkdir(folder)
+        for idx in range(args.files):
+            write_profile(os.path.join(folder, f'{idx}.dp_ascii'), 4, 250)
+        paths = sorted(glob.glob(os.path.join(folder, '*.dp_ascii')))
+        per_file_time = min(
+            timeit.repeat(
+                lambda: [read_depth_profile(path) for path in paths],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        batch_time = min(
+            timeit.repeat(
+                lambda: read_depth_profile_folder(folder),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+
+    print(f'{args.elements} elements x {args.points} points')
+    print(f'legacy loop:        {legacy_time * 1e3:9.1f} ms')
+    print(f'read_depth_profile: {reader_time * 1e3:9.1f} ms')
+    print(f'speedup:            {legacy_time / reader_time:9.1f}x')
+    print(f'{args.files} files x 4 elements x 250 points')
+    print(f'per file:           {per_file_time * 1e3:9.1f} ms')
+    print(f'folder pool:        {batch_time * 1e3:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
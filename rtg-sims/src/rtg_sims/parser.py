@@ -16,6 +16,8 @@
 # limitations under the License.
 #
 
+import os
+
 from nomad.datamodel.data import (
     EntryData,
 )
@@ -29,6 +31,7 @@ from nomad.metainfo import (
 from nomad.parsing import MatchingParser
 from nomad_measurements.utils import create_archive
 
+from rtg_sims.reader import parse_profiles_parallel, read_lines, split_profiles
 from rtg_sims.schema import (
     RTGSIMSMeasurement,
 )
@@ -44,7 +47,36 @@ class RTGSIMSDPFile(EntryData):
 
 
 class SIMSParser(MatchingParser):
-    def parse(self, mainfile: str, archive: EntryArchive, logger) -> None:
+    def is_mainfile(
+        self,
+        filename: str,
+        mime: str,
+        buffer: bytes,
+        decoded_buffer: str,
+        compression: str = None,
+    ):
+        is_mainfile = super().is_mainfile(
+            filename, mime, buffer, decoded_buffer, compression
+        )
+        if not is_mainfile:
+            return is_mainfile
+        try:
+            n_profiles = len(split_profiles(read_lines(filename)))
+        except (OSError, UnicodeDecodeError):
+            return is_mainfile
+        # the first profile is handled by the main entry, every other profile
+        # becomes a child entry
+        if n_profiles > 1:
+            return [str(index) for index in range(1, n_profiles)]
+        return is_mainfile
+
+    def parse(
+        self,
+        mainfile: str,
+        archive: EntryArchive,
+        logger=None,
+        child_archives: dict[str, EntryArchive] = None,
+    ) -> None:
         data_file = mainfile.split('/')[-1]
         data_file_with_path = mainfile.split('raw/')[-1]
         entry = RTGSIMSMeasurement.m_from_dict(RTGSIMSMeasurement.m_def.a_template)
@@ -55,3 +87,36 @@ class SIMSParser(MatchingParser):
             measurement=create_archive(entry, archive, file_name)
         )
         archive.metadata.entry_name = data_file + ' measurement file'
+        if child_archives:
+            self.parse_child_profiles(mainfile, data_file_with_path, child_archives)
+
+    def parse_child_profiles(
+        self,
+        mainfile: str,
+        data_file: str,
+        child_archives: dict[str, EntryArchive],
+    ) -> None:
+        """
+        Parses the depth profiles after the first one of a multi-profile file in
+        parallel and fills one child archive per profile.
+
+        Args:
+            mainfile (str): The path of the dp_ascii file.
+            data_file (str): The path of the dp_ascii file relative to the upload.
+            child_archives (dict[str, EntryArchive]): The child archives by the index
+                of their profile.
+        """
+        segments = split_profiles(read_lines(mainfile))
+        indices = sorted(int(key) for key in child_archives)
+        profiles = parse_profiles_parallel([segments[index] for index in indices])
+        for index, profile in zip(indices, profiles):
+            entry = RTGSIMSMeasurement.m_from_dict(RTGSIMSMeasurement.m_def.a_template)
+            entry.data_file = data_file
+            entry.profile_index = index
+            entry.set_profile(profile)
+            child_archive = child_archives[str(index)]
+            child_archive.data = entry
+            child_archive.metadata.entry_name = (
+                f'{os.path.basename(data_file)} '
+                f'depth profile {profile.depth_profile_id}'
+            )
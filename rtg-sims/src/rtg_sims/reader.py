@@ -0,0 +1,392 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Reader for the depth profile files (dp_ascii) exported by the RTG Mikroanalyse
+Cameca IMS.
+"""
+
+import glob
+import multiprocessing as mp
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import IO, Optional, Union
+
+import numpy as np
+
+QUALITATIVE_UNIT = '[c/s]'
+QUANTITATIVE_UNIT = '[Atom/cm3]'
+
+BLANK = 'blank'
+ELEMENT = 'element'
+POINTS = 'points'
+UNITS = 'units'
+NUMERIC = 'numeric'
+HEADER = 'header'
+OTHER = 'other'
+
+NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+RECORD_PATTERNS = (
+    (ELEMENT, re.compile(r'ELEMENT\s+(\S+)$')),
+    (POINTS, re.compile(r'(\d+)\s+points$', re.IGNORECASE)),
+    (UNITS, re.compile(r'(\[[^\]]*\])\s+(\[[^\]]*\])$')),
+    (NUMERIC, re.compile(rf'{NUMBER}\s+{NUMBER}$')),
+    (HEADER, re.compile(r'([^:]*?)\s*:\s*(.*)$')),
+)
+HEADER_FIELDS = {
+    'depth profile': 'depth_profile_id',
+    'date': 'date',
+    'matrix': 'matrix',
+    'sample name': 'sample_id',
+}
+
+
+@dataclass
+class DepthProfileBlock:
+    """
+    The data of one element in a depth profile file.
+    """
+
+    element: str
+    unit: str
+    data: np.ndarray
+
+    @property
+    def quantitative(self) -> bool:
+        return self.unit == QUANTITATIVE_UNIT
+
+    @property
+    def depth(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.data[:, 1]
+
+
+@dataclass
+class DepthProfileData:
+    """
+    The metadata and the element blocks of a depth profile file.
+    """
+
+    depth_profile_id: str = None
+    date: str = None
+    matrix: str = None
+    sample_id: str = None
+    blocks: list[DepthProfileBlock] = field(default_factory=list)
+
+    @property
+    def qualitative_blocks(self) -> list[DepthProfileBlock]:
+        return [block for block in self.blocks if not block.quantitative]
+
+    @property
+    def quantitative_blocks(self) -> list[DepthProfileBlock]:
+        return [block for block in self.blocks if block.quantitative]
+
+
+def classify(line: str) -> tuple[str, tuple[str, ...]]:
+    """
+    Classifies a line of a depth profile file by its structure.
+
+    Args:
+        line (str): The line, with or without the line terminator.
+
+    Returns:
+        tuple[str, tuple[str, ...]]: The record type (`BLANK`, `ELEMENT`, `POINTS`,
+        `UNITS`, `NUMERIC`, `HEADER` or `OTHER`) and the fields of the record.
+    """
+    stripped = line.strip()
+    if not stripped:
+        return BLANK, ()
+    for record, pattern in RECORD_PATTERNS:
+        match = pattern.match(stripped)
+        if match:
+            return record, match.groups()
+    return OTHER, ()
+
+
+def header_key(record: tuple[str, tuple[str, ...]]) -> Optional[str]:
+    """
+    Returns the normalized key of a header record, e.g. `sample name`, or `None` for
+    other records.
+    """
+    kind, fields = record
+    if kind != HEADER:
+        return None
+    return ' '.join(fields[0].lower().split())
+
+
+def _is_numeric(lines: list[str], idx: int) -> bool:
+    return idx < len(lines) and classify(lines[idx])[0] == NUMERIC
+
+
+def block_end(lines: list[str], start: int, points: Optional[int] = None) -> int:
+    """
+    Finds the end of the numeric rows of a block starting at line `start`. If the
+    number of points is given, only the rows at the edges of the expected slice are
+    checked; otherwise, or if the declared number does not match the file, the
+    numeric rows are counted one by one.
+
+    Args:
+        lines (list[str]): The lines of the file.
+        start (int): The index of the first numeric row.
+        points (Optional[int]): The number of points declared for the block.
+
+    Returns:
+        int: The index of the first line after the numeric rows.
+    """
+    if points:
+        stop = start + points
+        if _is_numeric(lines, stop - 1) and not _is_numeric(lines, stop):
+            return stop
+    stop = start
+    while _is_numeric(lines, stop):
+        stop += 1
+    return stop
+
+
+def number_duplicate_elements(elements: list[str]) -> list[str]:
+    """
+    Numbers the elements that were measured more than once, e.g. three `Zn` blocks
+    become `Zn1`, `Zn2` and `Zn3`. Elements measured once keep their name.
+
+    Args:
+        elements (list[str]): The element of every block in file order.
+
+    Returns:
+        list[str]: The unique element names.
+    """
+    counts = Counter(elements)
+    seen = Counter()
+    names = []
+    for element in elements:
+        name = element
+        if counts[element] > 1:
+            seen[element] += 1
+            name = f'{element}{seen[element]}'
+        names.append(name)
+    return names
+
+
+def index_blocks(lines: list[str]) -> tuple[DepthProfileData, list[tuple]]:
+    """
+    Runs once over the records of a depth profile file and collects the metadata
+    and the boundaries of the element blocks. Records are recognized by their
+    structure, independent of the whitespace between the fields. The numeric rows
+    of a block are skipped as a whole as soon as the block starts.
+
+    Args:
+        lines (list[str]): The lines of the file.
+
+    Returns:
+        tuple[DepthProfileData, list[tuple]]: The profile without blocks and one
+        `(element, unit, start, stop)` tuple per block, where `start` and `stop` are
+        the line indices of its numeric rows.
+
+    Raises:
+        ValueError: If a block of numeric rows is not preceded by an element.
+    """
+    profile = DepthProfileData()
+    boundaries = []
+    element = None
+    points = None
+    idx = 0
+    while idx < len(lines):
+        record, fields = classify(lines[idx])
+        idx += 1
+        if record == HEADER:
+            key = header_key((record, fields))
+            if key in HEADER_FIELDS:
+                setattr(profile, HEADER_FIELDS[key], fields[1].strip())
+        elif record == ELEMENT:
+            element = fields[0]
+            points = None
+        elif record == POINTS:
+            points = int(fields[0])
+        elif record == UNITS:
+            if element is None:
+                raise ValueError(f'Depth profile block without element in line {idx}.')
+            stop = block_end(lines, idx, points)
+            boundaries.append((element, fields[1], idx, stop))
+            element = None
+            points = None
+            idx = stop
+    names = number_duplicate_elements([boundary[0] for boundary in boundaries])
+    boundaries = [(name, *boundary[1:]) for name, boundary in zip(names, boundaries)]
+    return profile, boundaries
+
+
+def read_lines(file: Union[str, IO]) -> list[str]:
+    """
+    Reads the lines of a depth profile file.
+
+    Args:
+        file (Union[str, IO]): The path or an open text or binary handle of the file.
+
+    Returns:
+        list[str]: The lines without line terminators.
+    """
+    if isinstance(file, str):
+        with open(file) as fh:
+            text = fh.read()
+    else:
+        text = file.read()
+    if isinstance(text, bytes):
+        text = text.decode()
+    return text.splitlines()
+
+
+def split_profiles(lines: list[str]) -> list[list[str]]:
+    """
+    Splits the lines of a file at its `DEPTH PROFILE` records. The lines before the
+    first record, e.g. the instrument banner, belong to the first profile.
+
+    Args:
+        lines (list[str]): The lines of the file.
+
+    Returns:
+        list[list[str]]: The lines of each depth profile in the file.
+    """
+    starts = [
+        idx
+        for idx, line in enumerate(lines)
+        if ':' in line and header_key(classify(line)) == 'depth profile'
+    ]
+    if not starts:
+        return [lines]
+    starts[0] = 0
+    return [lines[start:stop] for start, stop in zip(starts, starts[1:] + [None])]
+
+
+def parse_profiles(segments: list[list[str]]) -> list[DepthProfileData]:
+    """
+    Parses the lines of the depth profiles of one file. The block boundaries of
+    every profile are found in a single pass over its records, then the numeric
+    rows of all blocks are converted in one call and each block gets a
+    `(points, 2)` view of depth and intensity or concentration into the result.
+
+    Args:
+        segments (list[list[str]]): The lines of each depth profile.
+
+    Returns:
+        list[DepthProfileData]: The metadata and the element blocks of each profile.
+    """
+    profiles = []
+    indexed = []
+    rows = []
+    for lines in segments:
+        profile, boundaries = index_blocks(lines)
+        profiles.append(profile)
+        for element, unit, start, stop in boundaries:
+            indexed.append((profile, element, unit, len(rows)))
+            rows.extend(lines[start:stop])
+    data = np.empty((0, 2))
+    if rows:
+        data = np.loadtxt(rows, dtype=np.float64, ndmin=2)
+    offsets = [offset for *_, offset in indexed[1:]] + [len(rows)]
+    for (profile, element, unit, start), stop in zip(indexed, offsets):
+        profile.blocks.append(
+            DepthProfileBlock(element=element, unit=unit, data=data[start:stop])
+        )
+    return profiles
+
+
+def parse_profiles_parallel(
+    segments: list[list[str]], max_workers: Optional[int] = None
+) -> list[DepthProfileData]:
+    """
+    Parses the lines of several depth profiles in a pool of worker processes, one
+    profile per task. Falls back to `parse_profiles` for a single profile or when
+    the current process is not allowed to start workers, e.g. inside a daemonic
+    celery worker.
+
+    Args:
+        segments (list[list[str]]): The lines of each depth profile.
+        max_workers (Optional[int]): The maximum number of worker processes.
+
+    Returns:
+        list[DepthProfileData]: The metadata and the element blocks of each profile.
+    """
+    if len(segments) <= 1 or max_workers == 1 or mp.current_process().daemon:
+        return parse_profiles(segments)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return [
+            profiles[0]
+            for profiles in executor.map(
+                parse_profiles, [[lines] for lines in segments]
+            )
+        ]
+
+
+def read_profiles(file: Union[str, IO]) -> list[DepthProfileData]:
+    """
+    Reads all depth profiles contained in a dp_ascii file.
+
+    Args:
+        file (Union[str, IO]): The path or an open handle of the file.
+
+    Returns:
+        list[DepthProfileData]: The metadata and the element blocks of each profile.
+    """
+    return parse_profiles(split_profiles(read_lines(file)))
+
+
+def read_depth_profile(file: Union[str, IO], index: int = 0) -> DepthProfileData:
+    """
+    Reads one depth profile of a dp_ascii file. The block boundaries are found in a
+    single pass over the records and the numeric rows are then converted to
+    `(points, 2)` float64 arrays of depth and intensity or concentration in one
+    call.
+
+    Args:
+        file (Union[str, IO]): The path or an open handle of the file.
+        index (int): The index of the profile in files with several profiles.
+
+    Returns:
+        DepthProfileData: The metadata and the element blocks.
+    """
+    return parse_profiles([split_profiles(read_lines(file))[index]])[0]
+
+
+def read_depth_profile_folder(
+    folder: str, pattern: str = '*.dp_ascii', max_workers: Optional[int] = None
+) -> dict[str, list[DepthProfileData]]:
+    """
+    Reads all depth profile files in a folder in a pool of worker processes, the
+    files are handed to the workers in chunks. Falls back to reading the files one
+    by one for a single file or worker, or when the current process is not allowed
+    to start workers, like `parse_profiles_parallel`.
+
+    Args:
+        folder (str): The folder containing the files.
+        pattern (str): The glob pattern of the depth profile files.
+        max_workers (Optional[int]): The maximum number of worker processes.
+
+    Returns:
+        dict[str, list[DepthProfileData]]: The profiles by file path, sorted by path.
+    """
+    paths = sorted(glob.glob(os.path.join(folder, pattern)))
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1 or mp.current_process().daemon:
+        return {path: read_profiles(path) for path in paths}
+    chunksize = max(1, len(paths) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(paths, executor.map(read_profiles, paths, chunksize=chunksize)))
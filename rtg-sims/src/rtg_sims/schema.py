@@ -10,6 +10,8 @@ from nomad.datamodel.metainfo.basesections import (
 from nomad.datamodel.metainfo.eln import Measurement
 from nomad.metainfo import Quantity, SchemaPackage, Section, SubSection
 
+from rtg_sims.reader import DepthProfileData, read_depth_profile
+
 configuration = config.get_plugin_entry_point('rtg_sims:schema')
 
 m_package = SchemaPackage(
@@ -109,6 +111,34 @@ class MeasurementResults(ArchiveSection):
     )
 
 
+def depth_profile_results(profile: DepthProfileData) -> MeasurementResults:
+    """
+    Builds the result sections straight from the arrays of a parsed depth profile.
+
+    Args:
+        profile (DepthProfileData): The parsed depth profile.
+
+    Returns:
+        MeasurementResults: The qualitative and quantitative depth profiles.
+    """
+    results = MeasurementResults()
+    results.depth_profiles_qualitative = [
+        DepthProfileQualitative(
+            element=block.element, depth=block.depth, intensity=block.values
+        )
+        for block in profile.qualitative_blocks
+    ]
+    results.depth_profiles_quantitative = [
+        DepthProfileQuantitative(
+            element=block.element,
+            depth=block.depth,
+            atomic_concentration=block.values,
+        )
+        for block in profile.quantitative_blocks
+    ]
+    return results
+
+
 class RTGSIMS(Measurement):
     """
     The secondary ion mass spectrometry is one of the established material analysis
@@ -177,135 +207,45 @@ class RTGSIMSMeasurement(RTGSIMS, EntryData):
             component='FileEditQuantity',
         ),
     )
+    profile_index = Quantity(
+        type=int,
+        description="""
+        Index of the depth profile in a data file containing several depth profiles.
+        """,
+    )
+
+    def set_profile(self, profile: DepthProfileData) -> None:
+        """
+        Sets the results and the metadata of the measurement from a parsed depth
+        profile.
+
+        Args:
+            profile (DepthProfileData): The parsed depth profile.
+        """
+        self.results = [depth_profile_results(profile)]
+        self.name = profile.depth_profile_id
+        self.Matrix = profile.matrix
+        self.datetime = datetime.strptime(
+            profile.date, '%d.%m.%y'
+        )  # noch in richtiges FOrmat ändern
+        self.SampleID = profile.sample_id
+        self.lab_id = profile.depth_profile_id
+        self.samples = [CompositeSystemReference(lab_id=profile.sample_id)]
 
     def normalize(self, archive, logger):
         # super(RTGSIMSMeasurement, self).normalize(archive, logger)
         logger.info('ExampleSection.normalize called')
 
-        def parse_depthprofile_data(self):
-            # with open (fp, "rt") as f:
-            data = self.readlines()
-            Zn_counter = 0
-            # this is particular for FBH data where different Zn ions were measured
-            element = None
-            depth_profiles_qual = []
-            depth_profiles_quant = []
-            unit = None
-            sims_dict = {}
-            for line in data:
-                if 'DEPTH PROFILE :' in line:
-                    depth_profile_id = (line.split(':')[1]).strip()
-                    sims_dict = dict(depth_profile_id=depth_profile_id)
-                elif 'Date' in line:
-                    date = (line.split(':')[1]).strip()
-                    sims_dict.update(dict(date=date))
-                elif 'Matrix' in line:
-                    matrix = (line.split(':')[1]).strip()
-                    sims_dict.update(dict(Matrix=matrix))
-                elif 'Sample name' in line:
-                    sample_id = (line.split(':')[1]).strip()
-                    sims_dict.update(dict(sample_id=sample_id))
-                elif 'ELEMENT' in line:
-                    element = (line.split('T ')[1]).strip('\n')
-                    if element == 'Zn':
-                        Zn_counter += 1
-                        element += str(Zn_counter)
-                elif 'points' in line:
-                    points = int(line.split(' points')[0])
-                    points_counter = 0
-                elif '[c/s]' in line:
-                    element_dict = dict(
-                        element=element, depth=[], intensity=[], unit=None
-                    )
-                    unit = line.split('] ')[1].strip()
-                    element_dict['unit'] = unit
-                    depth_profile_type = 'qual'
-                elif '[Atom/cm3]' in line:
-                    element_dict = dict(
-                        element=element, depth=[], atomic_concentration=[], unit=None
-                    )
-                    unit = line.split('] ')[1].strip()
-                    element_dict['unit'] = unit
-                    depth_profile_type = 'quant'
-                elif 'E+' in line or 'E-' in line:
-                    points_counter += 1
-                    if depth_profile_type == 'qual':
-                        element_dict['depth'].append(
-                            float(line.split('      ')[0].strip())
-                        )
-                        element_dict['intensity'].append(
-                            float(line.split('      ')[1].strip())
-                        )
-                        if points_counter == points:
-                            depth_profiles_qual.append(element_dict)
-                            points_counter = 0
-                            element_dict = {}
-                    if depth_profile_type == 'quant':
-                        element_dict['depth'].append(
-                            float(line.split('      ')[0].strip())
-                        )
-                        element_dict['atomic_concentration'].append(
-                            float(line.split('      ')[1].strip())
-                        )
-                        if points_counter == points:
-                            depth_profiles_quant.append(element_dict)
-                            points_counter = 0
-                            element_dict = {}
-            sims_dict.update(dict(depth_profiles_of_elements_qual=depth_profiles_qual))
-            sims_dict.update(
-                dict(depth_profiles_of_elements_quant=depth_profiles_quant)
-            )
-            return sims_dict
-
         # if not self.data_file:
         #    return
         if archive.data.data_file:
-            with archive.m_context.raw_file(self.data_file) as file:
-                sims_dict = parse_depthprofile_data(file)
-                self.name = sims_dict['depth_profile_id']
-                self.Matrix = sims_dict['Matrix']
-                self.datetime = datetime.strptime(
-                    sims_dict['date'], '%d.%m.%y'
-                )  # noch in richtiges FOrmat ändern
-                self.SampleID = sims_dict['sample_id']
-                self.lab_id = sims_dict['depth_profile_id']
-                logger.info('parser works')
-                samples = CompositeSystemReference()
-                samples.lab_id = sims_dict['sample_id']
-                samples.normalize(archive, logger)
-                self.samples = [samples]
-                results = MeasurementResults()
-                results.depth_profiles_qualitative = []
-                for count, value in enumerate(
-                    sims_dict['depth_profiles_of_elements_qual']
-                ):
-                    dep_profile_object = DepthProfileQualitative()
-                    dep_profile_object.element = sims_dict[
-                        'depth_profiles_of_elements_qual'
-                    ][count]['element']
-                    dep_profile_object.depth = sims_dict[
-                        'depth_profiles_of_elements_qual'
-                    ][count]['depth']
-                    dep_profile_object.intensity = sims_dict[
-                        'depth_profiles_of_elements_qual'
-                    ][count]['intensity']
-                    results.depth_profiles_qualitative.append(dep_profile_object)
-                results.depth_profiles_quantitative = []
-                for count, value in enumerate(
-                    sims_dict['depth_profiles_of_elements_quant']
-                ):
-                    dep_profile_object = DepthProfileQuantitative()
-                    dep_profile_object.element = sims_dict[
-                        'depth_profiles_of_elements_quant'
-                    ][count]['element']
-                    dep_profile_object.depth = sims_dict[
-                        'depth_profiles_of_elements_quant'
-                    ][count]['depth']
-                    dep_profile_object.atomic_concentration = sims_dict[
-                        'depth_profiles_of_elements_quant'
-                    ][count]['atomic_concentration']
-                    results.depth_profiles_quantitative.append(dep_profile_object)
-                self.results = [results]
+            # the child entries of multi-profile files are filled by the parser
+            if not (self.profile_index and self.results):
+                with archive.m_context.raw_file(self.data_file) as file:
+                    self.set_profile(read_depth_profile(file, self.profile_index or 0))
+            logger.info('parser works')
+            for sample in self.samples:
+                sample.normalize(archive, logger)
         super().normalize(archive, logger)
         # should come here
 
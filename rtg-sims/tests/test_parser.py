@@ -0,0 +1,36 @@
+import os.path
+
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from rtg_sims.parser import SIMSParser
+
+QUALITATIVE_ELEMENTS = 2
+
+
+def test_multi_profile_child_archives(tmp_path):
+    test_file = os.path.join(os.path.dirname(__file__), 'data', '22-285-AG.dp_ascii')
+    with open(test_file) as fh:
+        text = fh.read()
+    multi_file = tmp_path / 'multi.dp_ascii'
+    multi_file.write_text(
+        '\n'.join(
+            text.replace('7562h05.dp', f'7562h0{index}.dp') for index in range(5, 8)
+        )
+    )
+    parser = SIMSParser(name='rtg_sims', mainfile_name_re=r'.*\.dp_ascii')
+
+    assert parser.is_mainfile(test_file, 'text/plain', b'', '') is True
+    keys = parser.is_mainfile(str(multi_file), 'text/plain', b'', '')
+    assert keys == ['1', '2']
+
+    child_archives = {key: EntryArchive(metadata=EntryMetadata()) for key in keys}
+    parser.parse_child_profiles(str(multi_file), 'multi.dp_ascii', child_archives)
+    for key, child_archive in child_archives.items():
+        measurement = child_archive.data
+        assert measurement.profile_index == int(key)
+        assert measurement.name == f'7562h0{5 + int(key)}.dp'
+        assert measurement.samples[0].lab_id == '22-285-AG'
+        assert (
+            len(measurement.results[0].depth_profiles_qualitative)
+            == QUALITATIVE_ELEMENTS
+        )
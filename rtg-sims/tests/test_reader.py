@@ -0,0 +1,103 @@
+import io
+import os.path
+import shutil
+
+import numpy as np
+
+from rtg_sims.reader import (
+    parse_profiles_parallel,
+    read_depth_profile,
+    read_depth_profile_folder,
+    read_lines,
+    read_profiles,
+    split_profiles,
+)
+
+QUALITATIVE_ELEMENTS = 2
+COLUMNS = 2  # depth and intensity or concentration
+
+
+def test_read_depth_profile():
+    test_file = os.path.join(os.path.dirname(__file__), 'data', '22-285-AG.dp_ascii')
+    profile = read_depth_profile(test_file)
+
+    assert profile.depth_profile_id == '7562h05.dp'
+    assert profile.sample_id == '22-285-AG'
+    assert profile.matrix == '(AlGa)2O3'
+    assert len(profile.qualitative_blocks) == QUALITATIVE_ELEMENTS
+    assert not profile.quantitative_blocks
+    for block in profile.blocks:
+        assert block.data.shape[1] == COLUMNS
+        assert block.depth.shape == block.values.shape
+
+
+def test_read_depth_profile_export_variants():
+    text = (
+        'IMS CAMECA\n'
+        'DEPTH PROFILE:variant.dp\n'
+        'Date : 01.02.23\n'
+        'Sample name\t:\tvariant\n'
+        '\n'
+        'ELEMENT Zn\n'
+        '3 points\n'
+        '[um]\t[Atom/cm3]\n'
+        '0.1\t1.0e+18\n'
+        '  2.000000E-01   2.0E+18\n'
+        '3.0e-01 3\n'
+        'ELEMENT 27Al\n'
+        '[um] [c/s]\n'
+        '1E-01      4.5E+03\n'
+        '2E-01      4.6E+03\n'
+        '\n'
+        'ELEMENT Zn\n'
+        '5 points\n'
+        '[um]               [Atom/cm3]\n'
+        '1.000000E-01      7.000000E+17\n'
+    )
+    profile = read_depth_profile(io.StringIO(text))
+
+    assert profile.depth_profile_id == 'variant.dp'
+    assert profile.sample_id == 'variant'
+    assert [block.element for block in profile.blocks] == ['Zn1', '27Al', 'Zn2']
+    assert [len(block.depth) for block in profile.blocks] == [3, 2, 1]
+    assert profile.blocks[0].values.tolist() == [1.0e18, 2.0e18, 3.0]
+    assert [block.element for block in profile.quantitative_blocks] == ['Zn1', 'Zn2']
+
+
+def test_read_depth_profile_folder(tmp_path):
+    test_file = os.path.join(os.path.dirname(__file__), 'data', '22-285-AG.dp_ascii')
+    for name in ('a.dp_ascii', 'b.dp_ascii'):
+        shutil.copy(test_file, tmp_path / name)
+    single = read_depth_profile(test_file)
+    for max_workers in (2, 1):
+        profiles = read_depth_profile_folder(str(tmp_path), max_workers=max_workers)
+        assert [os.path.basename(path) for path in profiles] == [
+            'a.dp_ascii',
+            'b.dp_ascii',
+        ]
+        for (profile,) in profiles.values():
+            assert profile.sample_id == single.sample_id
+            for block, expected in zip(profile.blocks, single.blocks):
+                assert block.element == expected.element
+                assert np.array_equal(block.data, expected.data)
+
+
+def test_read_multi_profile_file(tmp_path):
+    test_file = os.path.join(os.path.dirname(__file__), 'data', '22-285-AG.dp_ascii')
+    with open(test_file) as fh:
+        text = fh.read()
+    multi_file = tmp_path / 'multi.dp_ascii'
+    multi_file.write_text(text + '\n' + text.replace('7562h05.dp', '7562h06.dp'))
+
+    profiles = read_profiles(str(multi_file))
+    assert [profile.depth_profile_id for profile in profiles] == [
+        '7562h05.dp',
+        '7562h06.dp',
+    ]
+    assert read_depth_profile(str(multi_file), 1).depth_profile_id == '7562h06.dp'
+
+    parallel = parse_profiles_parallel(split_profiles(read_lines(str(multi_file))))
+    for profile, expected in zip(parallel, profiles):
+        assert [block.element for block in profile.blocks] == ['27Al', '69Ga2']
+        for block, expected_block in zip(profile.blocks, expected.blocks):
+            assert np.array_equal(block.data, expected_block.data)
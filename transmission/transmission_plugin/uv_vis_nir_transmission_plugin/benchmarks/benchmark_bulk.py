@@ -0,0 +1,82 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Compares the throughput of `transmission.bulk.ingest` with the per-file flow of the
+`TransmissionParser`, which parses each `.asc` file into an intermediate
+`ELNUVVisNirTransmission` entry and reads the data in a second processing pass.
+
+Usage:
+    python benchmarks/benchmark_bulk.py [--copies 20] [--workers 4]
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+from nomad.client import normalize_all, parse
+from nomad.parsing.parsers import run_parser
+
+from transmission import parser as parser_entry_point
+from transmission.bulk import archive_file_name, find_data_files, ingest
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data')
+
+
+def two_pass(files: list[str]) -> None:
+    parser = parser_entry_point.load()
+    for file in files:
+        run_parser(os.path.abspath(file), parser)
+        archive = parse(archive_file_name(file))[0]
+        normalize_all(archive)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        for copy in range(args.copies):
+            for file in glob.glob(os.path.join(DATA_DIR, '*.asc')):
+                name = os.path.basename(file).replace(' ', '_')
+                shutil.copy(file, os.path.join(directory, f'{copy}_{name}'))
+        files = find_data_files(directory)
+        os.chdir(directory)
+        try:
+            start = time.perf_counter()
+            two_pass(files)
+            two_pass_time = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+        start = time.perf_counter()
+        ingest(directory, os.path.join(directory, 'bulk'), args.workers)
+        bulk_time = time.perf_counter() - start
+
+    print(f'files:    {len(files)}')
+    print(f'two-pass: {two_pass_time:.2f} s ({len(files) / two_pass_time:.1f} files/s)')
+    print(f'bulk:     {bulk_time:.2f} s ({len(files) / bulk_time:.1f} files/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Compares the time and peak memory of processing a large spectrum with the
+`TransmissionParser` writing the ELN to an `.archive.json` file, which is parsed and
+normalized as a second entry, and with the parser handing the ELN directly to a child
+entry, which is normalized right away.
+
+Usage:
+    python benchmarks/benchmark_child_entries.py [--points 50000] [--repeats 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from nomad.client import normalize_all, parse
+from nomad.parsing.parsers import run_parser
+
+from transmission import parser as parser_entry_point
+from transmission.bulk import archive_file_name
+from transmission.parser import MEASUREMENT_KEY
+
+DATA_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    'tests',
+    'data',
+    'F4-P3HT 1-10 0,5 mgml.Probe.Raw.asc',
+)
+STEP_LINE = 84
+POINTS_LINE = 85
+
+
+def write_spectrum(file_name: str, points: int) -> None:
+    """
+    Writes a copy of the test data file with `points` data points.
+    """
+    with open(DATA_FILE) as file:
+        lines = file.read().split('\n')
+    header = lines[: lines.index('#DATA') + 1]
+    start = float(header[STEP_LINE - 1])
+    step = -2000 / points
+    header[STEP_LINE] = f'{step:.6f}'
+    header[POINTS_LINE] = str(points)
+    wavelength = start + step * np.arange(points)
+    absorbance = 0.5 + 0.1 * np.sin(wavelength / 50)
+    with open(file_name, 'w') as file:
+        file.write('\n'.join(header) + '\n')
+        for row in zip(wavelength, absorbance):
+            file.write('{:.6f}\t{:.6f}\n'.format(*row))
+
+
+def file_entry(file_name: str) -> None:
+    run_parser(os.path.abspath(file_name), parser_entry_point.load())
+    normalize_all(parse(archive_file_name(file_name))[0])
+    os.remove(archive_file_name(file_name))
+
+
+def child_entry(file_name: str) -> None:
+    parser = parser_entry_point.model_copy(update={'child_entries': True}).load()
+    archives = run_parser(os.path.abspath(file_name), parser, [MEASUREMENT_KEY])
+    normalize_all(archives[1])
+
+
+def measure(function, file_name: str, repeats: int) -> tuple[float, float]:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(file_name)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(file_name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak / 1e6
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument('--points', type=int, default=50000)
+    argument_parser.add_argument('--repeats', type=int, default=3)
+    args = argument_parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            file_name = 'spectrum.asc'
+            write_spectrum(file_name, args.points)
+            child_entry(file_name)
+            results = {
+                'file': measure(file_entry, file_name, args.repeats),
+                'child': measure(child_entry, file_name, args.repeats),
+            }
+        finally:
+            os.chdir(cwd)
+
+    print(f'points: {args.points}')
+    for name, (duration, peak) in results.items():
+        print(f'{name + ":":7} {duration:.2f} s, peak {peak:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Compares `transmission.utils.merge_sections` with the previous recursive
+implementation, merging two equal `ELNUVVisNirTransmission` sections with nested
+transmission settings and large result arrays, as when an ELN is normalized again.
+
+Usage:
+    python benchmarks/benchmark_merge_sections.py [--settings 50] [--points 50000]
+"""
+
+import argparse
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+
+from transmission.schema import (
+    Aperture,
+    DetectorSettings,
+    ELNUVVisNirTransmission,
+    IntegrationTime,
+    LampSettings,
+    MonochromatorSettings,
+    MonochromatorSlitWidth,
+    NIRGain,
+    PolDepol,
+    UVVisNirTransmissionResult,
+    UVVisNirTransmissionSettings,
+)
+from transmission.utils import merge_sections
+
+LOGGER = SimpleNamespace(warning=lambda *args: None)
+
+
+def recursive_merge_sections(section, update, overwrite_quantity=False, logger=None):  # noqa: PLR0912
+    if update is None:
+        return
+    if section is None:
+        return
+    if not isinstance(section, type(update)):
+        raise TypeError(
+            'Cannot merge sections of different types: '
+            f'{type(section)} and {type(update)}'
+        )
+    for name, quantity in update.m_def.all_quantities.items():
+        if not update.m_is_set(quantity):
+            continue
+        if not section.m_is_set(quantity):
+            section.m_set(quantity, update.m_get(quantity))
+        elif (
+            quantity.is_scalar
+            and section.m_get(quantity) != update.m_get(quantity)
+            or not quantity.is_scalar
+            and (section.m_get(quantity) != update.m_get(quantity)).any()
+        ):
+            if overwrite_quantity:
+                section.m_set(quantity, update.m_get(quantity))
+            logger.warning(
+                f'Merging sections with different values for quantity "{name}".'
+            )
+    for name, sub_section_def in update.m_def.all_sub_sections.items():
+        count = section.m_sub_section_count(sub_section_def)
+        if count == 0:
+            for update_sub_section in update.m_get_sub_sections(sub_section_def):
+                section.m_add_sub_section(sub_section_def, update_sub_section)
+        elif count == update.m_sub_section_count(sub_section_def):
+            for i in range(count):
+                recursive_merge_sections(
+                    section.m_get_sub_section(sub_section_def, i),
+                    update.m_get_sub_section(sub_section_def, i),
+                    overwrite_quantity,
+                    logger,
+                )
+        elif update.m_sub_section_count(sub_section_def) > 0:
+            logger.warning(
+                f'Merging sections with different number of "{name}" sub sections.'
+            )
+
+
+def measurement(settings: int, points: int) -> ELNUVVisNirTransmission:
+    """
+    Returns a measurement with `settings` entries in each repeating sub section of the
+    transmission settings and results with `points` data points.
+    """
+    ranges = [
+        {'wavelength_lower_limit': 200.0 + i, 'wavelength_upper_limit': 201.0 + i}
+        for i in range(settings)
+    ]
+    wavelength = np.linspace(2500e-9, 200e-9, points)
+    return ELNUVVisNirTransmission(
+        name='measurement',
+        transmission_settings=UVVisNirTransmissionSettings(
+            sample_beam_position='Front',
+            common_beam_mask=100.0,
+            common_beam_depolarizer=True,
+            accessory=[
+                PolDepol(name=f'polarizer {i}', mode='Polarizer', polarizer_angle=i)
+                for i in range(settings)
+            ]
+            + [Aperture(name=f'aperture {i}', diameter=i) for i in range(settings)],
+            light_source=[LampSettings(**r, lamp_name='D2') for r in ranges],
+            monochromator=[
+                MonochromatorSettings(**r, monochromator_name='UV/VIS') for r in ranges
+            ],
+            detector=[DetectorSettings(**r, detector_name='PMT') for r in ranges],
+            monochromator_slit_width=[
+                MonochromatorSlitWidth(**r, slit_width=2.0, slit_width_servo=False)
+                for r in ranges
+            ],
+            nir_gain=[NIRGain(**r, nir_gain=1.0) for r in ranges],
+            integration_time=[
+                IntegrationTime(**r, integration_time=0.2) for r in ranges
+            ],
+        ),
+        results=[
+            UVVisNirTransmissionResult(
+                wavelength=wavelength,
+                transmittance=np.exp(-wavelength * 1e6),
+                absorbance=wavelength * 1e6,
+            )
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--settings', type=int, default=50)
+    parser.add_argument('--points', type=int, default=50000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    section = measurement(args.settings, args.points)
+    update = measurement(args.settings, args.points)
+    assert merge_sections(section, update) == []
+
+    for name, function in [
+        ('recursive', recursive_merge_sections),
+        ('iterative', merge_sections),
+    ]:
+        duration = timeit.timeit(
+            lambda: function(section, update, logger=LOGGER), number=args.number
+        )
+        print(f'{name + ":":11} {duration / args.number * 1e3:.2f} ms per merge')
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,7 @@
 #
 
 from nomad.config.models.plugins import ParserEntryPoint, SchemaPackageEntryPoint
+from pydantic import Field
 
 
 class TransmissionSchemaEntryPoint(SchemaPackageEntryPoint):
@@ -35,6 +36,15 @@ class TransmissionParserEntryPoint(ParserEntryPoint):
     Entry point for lazy loading of the TransmissionParser.
     """
 
+    child_entries: bool = Field(
+        False,
+        description="""
+        Whether to create the ELN of a data file directly as a child entry of the data
+        file instead of writing it to an `.archive.json` file, which is processed as a
+        separate entry. Child entries are not editable.
+        """,
+    )
+
     def load(self):
         from transmission.parser import TransmissionParser
 
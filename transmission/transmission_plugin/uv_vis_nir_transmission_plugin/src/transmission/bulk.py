@@ -0,0 +1,182 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Bulk ingestion of transmission data files. Reads all `.asc` files of a directory or a
+zip file in a pool of worker processes and builds the `ELNUVVisNirTransmission`
+sections directly, without the intermediate entry and second processing pass of the
+`TransmissionParser`. The archives are emitted together as `<name>.archive.json`
+files, ready to be uploaded alongside the data files.
+
+Usage:
+    python -m transmission.bulk <directory or zip> [--output <directory>]
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Optional,
+)
+
+DATA_FILE_PATTERN = '*.asc'
+
+
+def archive_file_name(data_file: str) -> str:
+    """
+    Returns the name of the archive file for a data file, e.g. `a.asc` becomes
+    `a.archive.json`, like in `TransmissionParser.parse`.
+    """
+    return f'{os.path.splitext(os.path.basename(data_file))[0]}.archive.json'
+
+
+def find_data_files(directory: str, pattern: str = DATA_FILE_PATTERN) -> list[str]:
+    """
+    Finds the data files in a directory and its subdirectories.
+
+    Args:
+        directory (str): The directory containing the files.
+        pattern (str, optional): The glob pattern of the data files.
+
+    Returns:
+        list[str]: The sorted paths of the data files.
+    """
+    return sorted(glob.glob(os.path.join(directory, '**', pattern), recursive=True))
+
+
+def read_data_file(file_path: str) -> dict[str, Any]:
+    """
+    Reads a data file and builds the `ELNUVVisNirTransmission` section of its
+    archive. Instruments are not resolved here as this needs the processing context.
+    They are resolved from the header of the data file when the entry is processed
+    in NOMAD. The digests of the data file and the results are set, so the data of
+    the file is not read again then.
+
+    Args:
+        file_path (str): The path of the data file.
+
+    Returns:
+        dict[str, Any]: The serialized archive with the measurement as `data`.
+    """
+    from nomad.datamodel import EntryArchive
+    from nomad.datamodel.context import ClientContext
+    from nomad.utils import get_logger
+
+    from transmission.schema import ELNUVVisNirTransmission
+    from transmission.utils import file_checksum
+
+    logger = get_logger(__name__)
+    archive = EntryArchive(m_context=ClientContext())
+    measurement = ELNUVVisNirTransmission.m_from_dict(
+        ELNUVVisNirTransmission.m_def.a_template
+    )
+    measurement.data_file = os.path.basename(file_path)
+    read_function, write_function = measurement.get_read_write_functions()
+    if read_function is None:
+        raise ValueError(f'No compatible reader found for the file: "{file_path}".')
+    with open(file_path, 'rb') as file:
+        measurement.data_file_checksum = file_checksum(file)
+    write_function(measurement, read_function(file_path, logger), archive, logger)
+    measurement.update_figures()
+    return {'data': measurement.m_to_dict(with_root_def=True)}
+
+
+def read_data_files(
+    files: list[str], max_workers: Optional[int] = None
+) -> dict[str, dict[str, Any]]:
+    """
+    Reads several data files in a pool of worker processes, one file per task. Falls
+    back to reading the files one by one for a single file or when the current
+    process is not allowed to start workers, e.g. inside a daemonic celery worker.
+
+    Args:
+        files (list[str]): The paths of the data files.
+        max_workers (Optional[int]): The maximum number of worker processes.
+
+    Returns:
+        dict[str, dict[str, Any]]: The serialized archives by data file path.
+    """
+    if len(files) <= 1 or max_workers == 1 or mp.current_process().daemon:
+        return {file: read_data_file(file) for file in files}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(files, executor.map(read_data_file, files, chunksize=4)))
+
+
+def ingest(
+    path: str,
+    output_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Reads all data files of a directory or a zip file, see `read_data_files`. If
+    `output_dir` is given, the archives are written to it as `<name>.archive.json`.
+
+    Args:
+        path (str): The directory or zip file containing the data files.
+        output_dir (Optional[str]): The directory to write the archives to.
+        max_workers (Optional[int]): The maximum number of worker processes.
+
+    Returns:
+        dict[str, dict[str, Any]]: The serialized archives by archive file name.
+
+    Raises:
+        ValueError: If two data files result in the same archive file name.
+    """
+    with tempfile.TemporaryDirectory() as extract_dir:
+        directory = path
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zip_file:
+                zip_file.extractall(extract_dir)
+            directory = extract_dir
+        archives = {}
+        for file, archive in read_data_files(
+            find_data_files(directory), max_workers
+        ).items():
+            file_name = archive_file_name(file)
+            if file_name in archives:
+                raise ValueError(f'Several data files result in "{file_name}".')
+            archives[file_name] = archive
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        for file_name, archive in archives.items():
+            with open(os.path.join(output_dir, file_name), 'w') as outfile:
+                json.dump(archive, outfile)
+    return archives
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Builds the archives of all transmission data files at once.'
+    )
+    parser.add_argument('path', help='directory or zip file with the .asc files')
+    parser.add_argument(
+        '--output', default='.', help='directory to write the archives to'
+    )
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+    archives = ingest(args.path, args.output, args.workers)
+    print(f'Wrote {len(archives)} archives to {args.output}.')
+
+
+if __name__ == '__main__':
+    main()
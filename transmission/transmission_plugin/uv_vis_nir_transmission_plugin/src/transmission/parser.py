@@ -15,10 +15,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import os
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
 from nomad.parsing import MatchingParser
 
+from transmission.bulk import archive_file_name
 from transmission.schema import ELNUVVisNirTransmission, RawFileTransmissionData
 from transmission.utils import create_archive
 
@@ -28,12 +31,49 @@ if TYPE_CHECKING:
     )
 
 
+MEASUREMENT_KEY = 'measurement'
+
+
 class TransmissionParser(MatchingParser):
     """
     Parser for matching files from Transmission Spectrophotometry and
     creating instances of ELN.
+
+    By default, the ELN is written to an `.archive.json` file next to the data file,
+    which is processed as a separate, editable entry. If `child_entries` is set, the
+    ELN is handed directly to a child entry of the data file instead. Data files
+    which already have an `.archive.json` file keep using it.
+
+    Args:
+        child_entries (bool, optional): Whether to create the ELN as a child entry.
     """
 
+    def __init__(self, child_entries: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.child_entries = child_entries
+        self.creates_children = child_entries
+
+    def is_mainfile(
+        self,
+        filename: str,
+        mime: str,
+        buffer: bytes,
+        decoded_buffer: str,
+        compression: str = None,
+    ) -> bool | Iterable[str]:
+        is_mainfile = super().is_mainfile(
+            filename, mime, buffer, decoded_buffer, compression
+        )
+        if (
+            is_mainfile
+            and self.child_entries
+            and not os.path.exists(
+                os.path.join(os.path.dirname(filename), archive_file_name(filename))
+            )
+        ):
+            return [MEASUREMENT_KEY]
+        return is_mainfile
+
     def parse(
         self, mainfile: str, archive: 'EntryArchive', logger=None, child_archives=None
     ) -> None:
@@ -42,8 +82,10 @@ class TransmissionParser(MatchingParser):
             ELNUVVisNirTransmission.m_def.a_template
         )
         entry.data_file = data_file
-        file_name = f'{".".join(data_file.split(".")[:-1])}.archive.json'
+        child_archive = (child_archives or {}).get(MEASUREMENT_KEY)
         archive.data = RawFileTransmissionData(
-            measurement=create_archive(entry, archive, file_name)
+            measurement=create_archive(
+                entry, archive, archive_file_name(data_file), child_archive
+            )
         )
         archive.metadata.entry_name = f'{data_file} data file'
@@ -76,7 +76,15 @@ from nomad.metainfo import (
 import pint
 from nomad_material_processing.general import Geometry
 
-from transmission.utils import create_archive, merge_sections
+from transmission.utils import (
+    InstrumentRegistry,
+    InstrumentResolver,
+    arrays_checksum,
+    create_archive,
+    file_checksum,
+    merge_sections,
+    read_perkin_elmer_asc_instrument,
+)
 
 if TYPE_CHECKING:
     from nomad.datamodel.datamodel import EntryArchive
@@ -344,6 +352,13 @@ class PerkinElmersLambdaSpectrophotometer(Spectrophotometer):
         super().normalize(archive, logger)
 
 
+instrument_resolver = InstrumentResolver(
+    entry_types=['Spectrophotometer', 'PerkinElmersLambdaSpectrophotometer'],
+    schema='transmission.schema.Spectrophotometer',
+)
+instrument_registry = InstrumentRegistry()
+
+
 class TransmissionSampleReference(CompositeSystemReference):
     """
     Reference to the sample used in the transmission measurement. Additionally,
@@ -1022,6 +1037,18 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
             component=ELNComponentEnum.FileEditQuantity,
         ),
     )
+    data_file_checksum = Quantity(
+        type=str,
+        description="""
+        SHA-256 digest of the content of the data file when it was last read. The data
+        file is only read again if its content changes.""",
+    )
+    results_checksum = Quantity(
+        type=str,
+        description="""
+        SHA-256 digest of the result arrays when the figures were last generated. The
+        figures are only generated again if the results change.""",
+    )
 
     def get_read_write_functions(self) -> tuple[Callable, Callable]:
         """
@@ -1035,6 +1062,18 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
             return read_perkin_elmer_asc, self.write_transmission_data
         return None, None
 
+    def get_instrument_read_function(self) -> Callable:
+        """
+        Method for getting the function reading only the instrument metadata of the
+        current data file.
+
+        Returns:
+            Callable: The read function.
+        """
+        if self.data_file.endswith('.asc'):
+            return read_perkin_elmer_asc_instrument
+        return None
+
     def create_instrument_entry(
         self, data_dict: dict[str, Any], archive: 'EntryArchive', logger: 'BoundLogger'
     ) -> InstrumentReference:
@@ -1080,7 +1119,8 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
         Looks for an existing instrument with the given serial number.
         If found, it returns a reference to this instrument.
         If no instrument is found, logs a warning, creates a new entry for the
-        instrument and returns a reference to this entry.
+        instrument and returns a reference to this entry. Concurrent calls for the
+        same instrument in an upload create the entry only once.
         If multiple instruments are found, it logs a warning and returns None.
 
         Args:
@@ -1096,32 +1136,27 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
         if isinstance(archive.m_context, ClientContext):
             return None
 
-        from nomad.search import search
-
         serial_number = data_dict['instrument_serial_number']
-        api_query = {
-            'entry_type:any': [
-                'Spectrophotometer',
-                'PerkinElmersLambdaSpectrophotometer',
-            ]
-        }
-        search_result = search(
-            owner='visible',
-            query=api_query,
-            user_id=archive.metadata.main_author.user_id,
-        )
-
-        valid_instruments = []
-        for entry in search_result.data:
-            if entry['data']['serial_number'] == serial_number:
-                valid_instruments.append(entry)
+        upload_id = archive.metadata.upload_id
+        user_id = archive.metadata.main_author.user_id
 
-        if not valid_instruments:
+        def create() -> str:
             logger.warning(
                 f'No "Spectrophotometer" instrument found with the serial '
                 f'number "{serial_number}". Creating an entry for the instrument.'
             )
-            return self.create_instrument_entry(data_dict, archive, logger)
+            reference = self.create_instrument_entry(
+                data_dict, archive, logger
+            ).reference.m_proxy_value
+            instrument_resolver.register(serial_number, upload_id, user_id, reference)
+            return reference
+
+        valid_instruments = instrument_registry.get_or_create(
+            upload_id,
+            serial_number,
+            lambda: instrument_resolver.resolve(serial_number, upload_id, user_id),
+            create,
+        )
 
         if len(valid_instruments) > 1:
             logger.warning(
@@ -1130,11 +1165,26 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
             )
             return None
 
-        upload_id = valid_instruments[0]['upload_id']
-        entry_id = valid_instruments[0]['entry_id']
-        m_proxy_value = f'../uploads/{upload_id}/archive/{entry_id}#/data'
+        return InstrumentReference(reference=valid_instruments[0])
 
-        return InstrumentReference(reference=m_proxy_value)
+    def update_instrument_reference(
+        self, data_dict: dict[str, Any], archive: 'EntryArchive', logger: 'BoundLogger'
+    ) -> None:
+        """
+        Method for setting the instrument of the section from the instrument data of
+        its data file. The instruments are kept if no instrument is found.
+
+        Args:
+            data_dict (dict[str, Any]): The dictionary containing the instrument data.
+            archive (EntryArchive): The archive containing the section.
+            logger (BoundLogger): A structlog logger.
+        """
+        instrument_reference = self.get_instrument_reference(data_dict, archive, logger)
+        if instrument_reference is None:
+            return
+        if isinstance(instrument_reference.reference, MProxy):
+            instrument_reference.reference.m_proxy_context = archive.m_context
+        self.instruments = [instrument_reference]
 
     def write_transmission_data(  # noqa: PLR0912, PLR0915
         self,
@@ -1144,7 +1194,9 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
         logger: 'BoundLogger',
     ) -> None:
         """
-        Populate `UVVisNirTransmission` section using data from a dict.
+        Populate `UVVisNirTransmission` section using data from a dict. The settings
+        are linked to the components of the instrument of the section, which is set
+        by `update_instrument_reference`.
 
         Args:
             data_dict (dict[str, Any]): A dictionary with the transmission data.
@@ -1155,14 +1207,7 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
         if data_dict['start_datetime'] is not None:
             transmission.datetime = data_dict['start_datetime']
 
-        # add instrument
-        instruments = []
-        instrument_reference = self.get_instrument_reference(data_dict, archive, logger)
-        if instrument_reference:
-            if isinstance(instrument_reference.reference, MProxy):
-                instrument_reference.reference.m_proxy_context = archive.m_context
-            instruments = [instrument_reference]
-        transmission.instruments = instruments
+        instrument_reference = self.instruments[0] if self.instruments else None
 
         # add results
         transmission.m_setdefault('results/0')
@@ -1404,9 +1449,37 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
 
         transmission.transmission_settings.normalize(archive, logger)
 
+    def update_figures(self) -> None:
+        """
+        Generates the figures of the first result if its arrays changed since the
+        figures were last generated, and stores the digest of the arrays in
+        `results_checksum`.
+        """
+        if not self.results:
+            return
+        result = self.results[0]
+        checksum = arrays_checksum(
+            *(
+                None if value is None else value.magnitude
+                for value in (
+                    result.wavelength,
+                    result.transmittance,
+                    result.absorbance,
+                )
+            )
+        )
+        if checksum != self.results_checksum or not self.figures:
+            self.figures = result.generate_plots()
+            self.results_checksum = checksum
+
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger'):
         """
-        The normalize function of the `ELNUVVisNirTransmission` section.
+        The normalize function of the `ELNUVVisNirTransmission` section. The data file
+        is only read and merged if its content changed since it was last read, in which
+        case its values overwrite the ones in the section. Otherwise only the instrument
+        metadata is read if the section has no instrument yet, so that instruments
+        uploaded later are linked. The figures are only generated if the results
+        changed.
 
         Args:
             archive (EntryArchive): The archive containing the section that is being
@@ -1420,18 +1493,29 @@ class ELNUVVisNirTransmission(UVVisNirTransmission, PlotSection, EntryData):
                     f'No compatible reader found for the file: "{self.data_file}".'
                 )
             else:
-                with archive.m_context.raw_file(self.data_file) as file:
-                    data_dict = read_function(file.name, logger)
-                transmission = self.m_def.section_cls()
-                write_function(transmission, data_dict, archive, logger)
-                merge_sections(self, transmission, logger)
+                data_dict = None
+                instrument_data = None
+                with archive.m_context.raw_file(self.data_file, 'rb') as file:
+                    checksum = file_checksum(file)
+                    if checksum != self.data_file_checksum or not self.results:
+                        data_dict = read_function(file.name, logger)
+                        instrument_data = data_dict
+                    elif not self.instruments:
+                        read_instrument = self.get_instrument_read_function()
+                        instrument_data = read_instrument(file.name, logger)
+                if instrument_data is not None:
+                    self.update_instrument_reference(instrument_data, archive, logger)
+                if data_dict is not None:
+                    transmission = self.m_def.section_cls()
+                    write_function(transmission, data_dict, archive, logger)
+                    merge_sections(
+                        self, transmission, overwrite_quantity=True, logger=logger
+                    )
+                    self.data_file_checksum = checksum
 
         super().normalize(archive, logger)
 
-        if not self.results:
-            return
-
-        self.figures = self.results[0].generate_plots()
+        self.update_figures()
 
 
 class RawFileTransmissionData(EntryData):
@@ -1,8 +1,19 @@
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import (
+    IO,
     TYPE_CHECKING,
+    Any,
+    Callable,
+    NamedTuple,
 )
 
+import numpy as np
+
 if TYPE_CHECKING:
     from nomad.datamodel import (
         EntryArchive,
@@ -10,17 +21,112 @@ if TYPE_CHECKING:
     from nomad.datamodel.data import (
         ArchiveSection,
     )
+    from nomad.metainfo import (
+        Quantity,
+        Section,
+        SubSection,
+    )
     from structlog.stdlib import (
         BoundLogger,
     )
 
 
+class MergeDifference(NamedTuple):
+    """
+    A difference found by `merge_sections`.
+
+    Args:
+        path (str): The path of the section in the merged section, e.g.
+            `results/0`. Empty for the merged section itself.
+        name (str): The name of the quantity or sub section.
+        kind (str): `quantity` for different values of a quantity or `sub_section`
+            for a different number of repeating sub sections.
+        overwritten (bool): Whether the value in the merged section was overwritten.
+    """
+
+    path: str
+    name: str
+    kind: str
+    overwritten: bool = False
+
+
+MERGE_PLAN_CACHE_SIZE = 256
+
+
+class MergePlan(NamedTuple):
+    """
+    The quantities and sub sections of a section definition merged by
+    `merge_sections`. Quantities are tuples of the name, the definition and whether
+    the value is stored as is in the section, so it can be compared without the unit
+    handling of `m_get`. Sub sections are tuples of the name, the definition and
+    whether the sub section repeats. Derived quantities are not merged.
+    """
+
+    quantities: tuple[tuple[str, 'Quantity', bool], ...]
+    sub_sections: tuple[tuple[str, 'SubSection', bool], ...]
+
+
+@lru_cache(maxsize=MERGE_PLAN_CACHE_SIZE)
+def merge_plan(section_def: 'Section') -> MergePlan:
+    """
+    Returns the `MergePlan` of a section definition. The plans of the last
+    `MERGE_PLAN_CACHE_SIZE` section definitions are kept, so definitions of
+    reloaded schema packages do not pile up.
+    """
+    from nomad.metainfo.metainfo import QuantityReference
+
+    return MergePlan(
+        quantities=tuple(
+            (
+                name,
+                quantity,
+                not quantity.use_full_storage
+                and not isinstance(quantity.type, QuantityReference),
+            )
+            for name, quantity in section_def.all_quantities.items()
+            if quantity.derived is None
+        ),
+        sub_sections=tuple(
+            (name, sub_section, sub_section.repeats)
+            for name, sub_section in section_def.all_sub_sections.items()
+        ),
+    )
+
+
+def values_equal(value: Any, other: Any) -> bool:
+    """
+    Compares two quantity values. Arrays are compared by shape and data type first,
+    so only arrays which can be equal are compared element wise, and NaNs are
+    considered equal.
+
+    Args:
+        value (Any): The first value.
+        other (Any): The second value.
+
+    Returns:
+        bool: Whether the values are equal.
+    """
+    if value is other:
+        return True
+    value = getattr(value, 'magnitude', value)
+    other = getattr(other, 'magnitude', other)
+    if not isinstance(value, np.ndarray) and not isinstance(other, np.ndarray):
+        return bool(value == other)
+    value = np.asarray(value)
+    other = np.asarray(other)
+    if value.shape != other.shape:
+        return False
+    if value.dtype != other.dtype:
+        return np.array_equal(value, other)
+    return np.array_equal(value, other, equal_nan=value.dtype.kind in 'fc')
+
+
 def merge_sections(  # noqa: PLR0912
     section: 'ArchiveSection',
     update: 'ArchiveSection',
     overwrite_quantity: bool = False,
     logger: 'BoundLogger' = None,
-) -> None:
+) -> list[MergeDifference]:
     """
     Updates the `section` based on the `update` section.
     Unpopulated quantities and subsections in the `section` will be populated with the
@@ -29,6 +135,8 @@ def merge_sections(  # noqa: PLR0912
     a warning will be issued, and `section` will remain unchanged.
     In case a quantity is present in both sections, the one in `section` will be
     overwritten provided that `overwrite_quantity` is set to `True`.
+    The section trees are walked iteratively using the `MergePlan` of each section
+    definition.
 
     Args:
         section (ArchiveSection): section to update.
@@ -38,55 +146,74 @@ def merge_sections(  # noqa: PLR0912
 
     Raises:
         TypeError: If the sections are of different types.
+
+    Returns:
+        list[MergeDifference]: The differences between the sections.
     """
-    if update is None:
-        return
-    if section is None:
-        section = update.m_copy()
-        return
-    if not isinstance(section, type(update)):
-        raise TypeError(
-            'Cannot merge sections of different types: '
-            f'{type(section)} and {type(update)}'
-        )
-    for name, quantity in update.m_def.all_quantities.items():
-        if not update.m_is_set(quantity):
-            continue
-        if not section.m_is_set(quantity):
-            section.m_set(quantity, update.m_get(quantity))
-        elif (
-            quantity.is_scalar
-            and section.m_get(quantity) != update.m_get(quantity)
-            or not quantity.is_scalar
-            and (section.m_get(quantity) != update.m_get(quantity)).any()
-        ):
-            if overwrite_quantity:
+    differences: list[MergeDifference] = []
+    if section is None or update is None:
+        return differences
+    stack = [(section, update, '')]
+    while stack:
+        section, update, path = stack.pop()
+        if not isinstance(section, type(update)):
+            raise TypeError(
+                'Cannot merge sections of different types: '
+                f'{type(section)} and {type(update)}'
+            )
+        plan = merge_plan(update.m_def)
+        section_values = section.__dict__
+        update_values = update.__dict__
+        for name, quantity, stored in plan.quantities:
+            if name not in update_values:
+                continue
+            if name not in section_values:
                 section.m_set(quantity, update.m_get(quantity))
-            warning = f'Merging sections with different values for quantity "{name}".'
-            if logger:
-                logger.warning(warning)
+                continue
+            if stored:
+                equal = values_equal(section_values[name], update_values[name])
             else:
-                print(warning)
-    for name, sub_section_def in update.m_def.all_sub_sections.items():
-        count = section.m_sub_section_count(sub_section_def)
-        if count == 0:
-            for update_sub_section in update.m_get_sub_sections(sub_section_def):
-                section.m_add_sub_section(sub_section_def, update_sub_section)
-        elif count == update.m_sub_section_count(sub_section_def):
-            for i in range(count):
-                merge_sections(
-                    section.m_get_sub_section(sub_section_def, i),
-                    update.m_get_sub_section(sub_section_def, i),
-                    logger,
-                )
-        elif update.m_sub_section_count(sub_section_def) > 0:
-            warning = (
-                f'Merging sections with different number of "{name}" sub sections.'
+                equal = values_equal(section.m_get(quantity), update.m_get(quantity))
+            if equal:
+                continue
+            if overwrite_quantity:
+                section.m_set(quantity, update.m_get(quantity))
+            differences.append(
+                MergeDifference(path, name, 'quantity', overwrite_quantity)
             )
             if logger:
-                logger.warning(warning)
+                logger.warning(
+                    f'Merging sections with different values for quantity "{name}".'
+                )
+        children = []
+        for name, sub_section, repeats in plan.sub_sections:
+            update_sub_sections = update.m_get_sub_sections(sub_section)
+            if not update_sub_sections:
+                continue
+            sub_sections = section.m_get_sub_sections(sub_section)
+            if not sub_sections:
+                for update_sub_section in update_sub_sections:
+                    section.m_add_sub_section(sub_section, update_sub_section)
+            elif len(sub_sections) == len(update_sub_sections):
+                sub_section_path = f'{path}/{name}' if path else name
+                for index, pair in enumerate(zip(sub_sections, update_sub_sections)):
+                    children.append(
+                        (
+                            *pair,
+                            f'{sub_section_path}/{index}'
+                            if repeats
+                            else sub_section_path,
+                        )
+                    )
             else:
-                print(warning)
+                differences.append(MergeDifference(path, name, 'sub_section'))
+                if logger:
+                    logger.warning(
+                        'Merging sections with different number of '
+                        f'"{name}" sub sections.'
+                    )
+        stack.extend(reversed(children))
+    return differences
 
 
 def get_reference(upload_id, entry_id):
@@ -99,15 +226,50 @@ def get_entry_id_from_file_name(file_name, archive):
     return hash(archive.metadata.upload_id, file_name)
 
 
+def get_child_entry_id(child_archive, archive):
+    from nomad.utils import generate_entry_id
+
+    return generate_entry_id(
+        archive.metadata.upload_id,
+        archive.metadata.mainfile,
+        child_archive.metadata.mainfile_key,
+    )
+
+
 def create_archive(
     entity: 'ArchiveSection',
     archive: 'EntryArchive',
     file_name: str,
+    child_archive: 'EntryArchive' = None,
 ) -> str:
+    """
+    Creates an entry for the `entity` and returns a reference to its data section.
+    If a `child_archive` is given, the `entity` is handed to it directly and becomes a
+    child entry of the mainfile of `archive`, without serializing it to a raw file and
+    processing that file again. Otherwise the `entity` is written to the raw file
+    `file_name`, which is processed if it does not exist yet.
+
+    Args:
+        entity (ArchiveSection): The data section of the entry.
+        archive (EntryArchive): The archive of the entry being processed.
+        file_name (str): The name of the raw file to write the entry to.
+        child_archive (EntryArchive, optional): The child archive created by the
+            parser for the entry.
+
+    Returns:
+        str: The reference to the data section of the created entry.
+    """
     import json
 
     from nomad.datamodel.context import ClientContext
 
+    if child_archive is not None:
+        if child_archive.m_context is None:
+            child_archive.m_context = archive.m_context
+        child_archive.data = entity
+        return get_reference(
+            archive.metadata.upload_id, get_child_entry_id(child_archive, archive)
+        )
     entity_entry = entity.m_to_dict(with_root_def=True)
     if isinstance(archive.m_context, ClientContext):
         with open(file_name, 'w') as outfile:
@@ -120,3 +282,303 @@ def create_archive(
     return get_reference(
         archive.metadata.upload_id, get_entry_id_from_file_name(file_name, archive)
     )
+
+
+CHECKSUM_CHUNK_SIZE = 1 << 20
+
+
+def file_checksum(file: IO[bytes]) -> str:
+    """
+    Returns the SHA-256 digest of the content of a file opened in binary mode. The
+    file is read in chunks of `CHECKSUM_CHUNK_SIZE` bytes.
+
+    Args:
+        file (IO[bytes]): The file to compute the digest of.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(CHECKSUM_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def arrays_checksum(*arrays: np.ndarray) -> str:
+    """
+    Returns the SHA-256 digest of the data type, shape and content of the arrays.
+    Arrays which are `None` are part of the digest as well.
+
+    Args:
+        *arrays (np.ndarray): The arrays to compute the digest of.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    for array in arrays:
+        if array is None:
+            digest.update(b'None')
+            continue
+        contiguous = np.ascontiguousarray(array)
+        digest.update(f'{contiguous.dtype.str}{contiguous.shape}'.encode())
+        digest.update(contiguous.data)
+    return digest.hexdigest()
+
+
+PERKIN_ELMER_ASC_INSTRUMENT_LINES = {
+    'instrument_name': 11,
+    'instrument_serial_number': 12,
+    'instrument_firmware_version': 13,
+}
+
+
+def read_perkin_elmer_asc_instrument(
+    file_path: str, logger: 'BoundLogger' = None
+) -> dict[str, Any]:
+    """
+    Reads only the instrument metadata from the header of a PerkinElmer *.asc file,
+    with the same keys and values as `read_perkin_elmer_asc`. Used to resolve the
+    instrument of a measurement without reading its data.
+
+    Args:
+        file_path (str): The path to the transmission data file.
+        logger (BoundLogger, optional): A structlog logger. Defaults to None.
+
+    Returns:
+        dict[str, Any]: The instrument name, serial number, firmware version and the
+        start datetime of the measurement.
+    """
+    import pint
+    from fairmat_readers_transmission.perkin_elmers_asc import read_start_datetime
+
+    metadata = []
+    with open(file_path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip() == '#DATA':
+                break
+            metadata.append(line.strip())
+
+    ureg = pint.get_application_registry()
+    output: dict[str, Any] = {'start_datetime': read_start_datetime(metadata, logger)}
+    for key, index in PERKIN_ELMER_ASC_INSTRUMENT_LINES.items():
+        output[key] = None
+        if metadata[index]:
+            try:
+                output[key] = float(metadata[index]) * ureg.dimensionless
+            except ValueError:
+                output[key] = metadata[index]
+    return output
+
+
+INSTRUMENT_CACHE_TTL = 300
+INSTRUMENT_CACHE_SIZE = 256
+INSTRUMENT_REGISTRY_SIZE = 1024
+
+
+class InstrumentResolver:
+    """
+    Resolves the references of instrument entries by serial number. The serial
+    number is part of the search query, so only matching entries are returned by the
+    search backend. The results are cached per upload and user for `ttl` seconds and
+    at most `max_entries` results are kept, the least recently used ones are evicted
+    first. Instruments created during processing can be registered, so that the other
+    files of the upload use them before they are indexed.
+
+    Args:
+        entry_types (list[str]): The entry types of the instruments.
+        schema (str): The qualified name of the section defining `serial_number`.
+        search_function (Callable, optional): The search backend with the signature
+            of `nomad.search.search`. Defaults to `nomad.search.search`.
+        ttl (float, optional): The time in seconds a result is cached.
+        max_entries (int, optional): The maximum number of cached results.
+    """
+
+    def __init__(
+        self,
+        entry_types: list[str],
+        schema: str,
+        search_function: Callable = None,
+        ttl: float = INSTRUMENT_CACHE_TTL,
+        max_entries: int = INSTRUMENT_CACHE_SIZE,
+    ):
+        self.entry_types = entry_types
+        self.schema = schema
+        self.search_function = search_function
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple, tuple[float, list[str]]] = OrderedDict()
+
+    def query(self, serial_number: str) -> dict[str, Any]:
+        """
+        Returns the search query for the instruments with the `serial_number`.
+        """
+        return {
+            'entry_type:any': self.entry_types,
+            f'data.serial_number#{self.schema}': serial_number,
+        }
+
+    def _search(self, serial_number: str, user_id: str) -> list[str]:
+        search_function = self.search_function
+        if search_function is None:
+            from nomad.search import search as search_function
+
+        search_result = search_function(
+            owner='visible',
+            query=self.query(serial_number),
+            user_id=user_id,
+        )
+        return [
+            get_reference(entry['upload_id'], entry['entry_id'])
+            for entry in search_result.data
+            if entry.get('data', {}).get('serial_number') == serial_number
+        ]
+
+    def resolve(self, serial_number: str, upload_id: str, user_id: str) -> list[str]:
+        """
+        Returns the references of all instruments visible to the user with the
+        `serial_number`. Only searches if no unexpired result is cached.
+
+        Args:
+            serial_number (str): The serial number of the instrument.
+            upload_id (str): The id of the upload being processed.
+            user_id (str): The id of the user performing the search.
+
+        Returns:
+            list[str]: The references to the data sections of the instruments.
+        """
+        key = (upload_id, user_id, serial_number)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(cached[1])
+            self.misses += 1
+        references = self._search(serial_number, user_id)
+        self._store(key, references)
+        return list(references)
+
+    def register(
+        self, serial_number: str, upload_id: str, user_id: str, reference: str
+    ) -> None:
+        """
+        Registers the reference of an instrument entry created in the upload as the
+        only instrument with the `serial_number`.
+        """
+        self._store((upload_id, user_id, serial_number), [reference])
+
+    def _store(self, key: tuple, references: list[str]) -> None:
+        with self._lock:
+            self._cache[key] = (time.monotonic(), references)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all cached results and resets the counters.
+        """
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class InstrumentRegistry:
+    """
+    An upload scoped get-or-create registry for instrument entries. Workers
+    resolving the same serial number in the same upload are serialized by a lock per
+    upload and serial number, so an instrument entry is created exactly once and all
+    other workers wait for it and get its reference. The references of created
+    instruments are kept for `ttl` seconds, after which the instruments are resolved
+    again, so that deleted instruments are created again. At most `max_entries`
+    created instruments are kept. The lock of a key is removed as soon as no worker
+    holds or waits for it.
+
+    Args:
+        ttl (float, optional): The time in seconds a created instrument is kept.
+        max_entries (int, optional): The maximum number of registered instruments.
+    """
+
+    def __init__(
+        self,
+        ttl: float = INSTRUMENT_CACHE_TTL,
+        max_entries: int = INSTRUMENT_REGISTRY_SIZE,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.created = 0
+        self._lock = threading.Lock()
+        # the lock of every key in use and the number of workers using it
+        self._locks: dict[tuple, list] = {}
+        self._references: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+
+    def get_or_create(
+        self,
+        upload_id: str,
+        serial_number: str,
+        resolve: Callable[[], list[str]],
+        create: Callable[[], str],
+    ) -> list[str]:
+        """
+        Returns the references of the instruments with the `serial_number`. If the
+        instrument was created in the upload less than `ttl` seconds ago, its
+        reference is returned.
+        Otherwise the instruments are resolved and, if none is found, created.
+
+        Args:
+            upload_id (str): The id of the upload being processed.
+            serial_number (str): The serial number of the instrument.
+            resolve (Callable[[], list[str]]): Returns the references of the existing
+                instruments.
+            create (Callable[[], str]): Creates the instrument entry and returns its
+                reference.
+
+        Returns:
+            list[str]: The references to the data sections of the instruments.
+        """
+        key = (upload_id, serial_number)
+        with self._lock:
+            lock = self._locks.setdefault(key, [threading.Lock(), 0])
+            lock[1] += 1
+        try:
+            with lock[0]:
+                return self._get_or_create(key, resolve, create)
+        finally:
+            with self._lock:
+                lock[1] -= 1
+                if not lock[1] and self._locks.get(key) is lock:
+                    del self._locks[key]
+
+    def _get_or_create(
+        self,
+        key: tuple,
+        resolve: Callable[[], list[str]],
+        create: Callable[[], str],
+    ) -> list[str]:
+        created = self._references.get(key)
+        if created is not None and time.monotonic() - created[0] < self.ttl:
+            return [created[1]]
+        references = resolve()
+        if references:
+            return references
+        reference = create()
+        with self._lock:
+            self.created += 1
+            self._references[key] = (time.monotonic(), reference)
+            self._references.move_to_end(key)
+            while len(self._references) > self.max_entries:
+                self._references.popitem(last=False)
+        return [reference]
+
+    def clear(self) -> None:
+        """
+        Removes all registered instruments and resets the counter.
+        """
+        with self._lock:
+            self._references.clear()
+            self.created = 0
@@ -0,0 +1,80 @@
+import importlib
+import json
+import os
+import shutil
+import zipfile
+
+from nomad.client import normalize_all, parse
+
+from transmission.bulk import find_data_files, ingest
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def test_ingest_zip(tmp_path):
+    zip_path = tmp_path / 'spectra.zip'
+    with zipfile.ZipFile(zip_path, 'w') as zip_file:
+        for file in find_data_files(DATA_DIR):
+            zip_file.write(file, os.path.basename(file))
+
+    archives = ingest(str(zip_path), str(tmp_path / 'archives'), max_workers=2)
+
+    assert sorted(archives) == sorted(os.listdir(tmp_path / 'archives'))
+    assert len(archives) == len(find_data_files(DATA_DIR))
+    with open(tmp_path / 'archives' / 'KTF-D.Probe.Raw.archive.json') as file:
+        data = json.load(file)['data']
+    assert data['m_def'] == 'transmission.schema.ELNUVVisNirTransmission'
+    assert data['data_file'] == 'KTF-D.Probe.Raw.asc'
+    assert len(data['results'][0]['wavelength']) > 0
+
+
+def test_ingested_archive_is_not_read_again(tmp_path, monkeypatch):
+    schema = importlib.import_module('transmission.schema')
+    data_file = os.path.join(DATA_DIR, 'KTF-D.Probe.Raw.asc')
+    shutil.copy(data_file, tmp_path)
+    ingest(str(tmp_path), str(tmp_path))
+    archive = parse(str(tmp_path / 'KTF-D.Probe.Raw.archive.json'))[0]
+    assert archive.data.data_file_checksum is not None
+    assert archive.data.results_checksum is not None
+
+    reads = []
+    monkeypatch.setattr(
+        schema, 'read_perkin_elmer_asc', lambda *args: reads.append(args)
+    )
+    generate_plots = []
+
+    def record_generate_plots(result):
+        generate_plots.append(result)
+        return []
+
+    monkeypatch.setattr(
+        schema.UVVisNirTransmissionResult, 'generate_plots', record_generate_plots
+    )
+    normalize_all(archive)
+    assert not reads
+    assert not generate_plots
+    assert archive.data.figures
+
+
+def test_ingested_archive_gets_instrument(tmp_path, monkeypatch):
+    schema = importlib.import_module('transmission.schema')
+    shutil.copy(os.path.join(DATA_DIR, 'KTF-D.Probe.Raw.asc'), tmp_path)
+    ingest(str(tmp_path), str(tmp_path))
+    archive = parse(str(tmp_path / 'KTF-D.Probe.Raw.archive.json'))[0]
+    assert not archive.data.instruments
+
+    instrument = schema.Spectrophotometer(name='Lambda 950')
+    serial_numbers = []
+
+    def get_instrument_reference(self, data_dict, archive, logger):
+        serial_numbers.append(data_dict['instrument_serial_number'])
+        return schema.InstrumentReference(reference=instrument)
+
+    monkeypatch.setattr(
+        schema.ELNUVVisNirTransmission,
+        'get_instrument_reference',
+        get_instrument_reference,
+    )
+    normalize_all(archive)
+    assert serial_numbers == ['1050L1611222']
+    assert archive.data.instruments[0].reference is instrument
@@ -15,9 +15,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import importlib
+import os
+import shutil
 
 import pytest
-from nomad.client import normalize_all
+from nomad.client import normalize_all, parse
+from nomad.parsing.parsers import run_parser
+
+from transmission import parser as parser_entry_point
+from transmission.parser import MEASUREMENT_KEY
+
+DATA_POINTS = 1001
 
 
 @pytest.mark.usefixtures('caplog')
@@ -29,3 +38,89 @@ from nomad.client import normalize_all
 def test_normalize_all(parsed_archive):
     normalize_all(parsed_archive)
     # TODO test the normalized data
+
+
+def test_child_entries(tmp_path):
+    data_file = str(tmp_path / 'KTF-D.Probe.Raw.asc')
+    shutil.copy(
+        os.path.join(os.path.dirname(__file__), 'data', 'KTF-D.Probe.Raw.asc'),
+        data_file,
+    )
+    parser = parser_entry_point.model_copy(update={'child_entries': True}).load()
+    assert parser.is_mainfile(data_file, 'text/plain', b'', '') == [MEASUREMENT_KEY]
+
+    file_archive, measurement_archive = run_parser(data_file, parser, [MEASUREMENT_KEY])
+    normalize_all(measurement_archive)
+    assert file_archive.data.measurement.m_proxy_value.endswith('#/data')
+    assert len(measurement_archive.data.results[0].transmittance) == DATA_POINTS
+    assert os.listdir(tmp_path) == ['KTF-D.Probe.Raw.asc']
+
+    open(tmp_path / 'KTF-D.Probe.Raw.archive.json', 'w').close()
+    assert parser.is_mainfile(data_file, 'text/plain', b'', '') is True
+
+
+def test_normalize_unchanged_data_file(tmp_path, monkeypatch):
+    schema = importlib.import_module('transmission.schema')
+    data_file = str(tmp_path / 'KTF-D.Probe.Raw.asc')
+    shutil.copy(
+        os.path.join(os.path.dirname(__file__), 'data', 'KTF-D.Probe.Raw.asc'),
+        data_file,
+    )
+    run_parser(data_file, parser_entry_point.load())
+    archive = parse(str(tmp_path / 'KTF-D.Probe.Raw.archive.json'))[0]
+    normalize_all(archive)
+    figures = archive.data.figures
+    assert archive.data.data_file_checksum is not None
+
+    reads = []
+    read_perkin_elmer_asc = schema.read_perkin_elmer_asc
+    monkeypatch.setattr(
+        schema,
+        'read_perkin_elmer_asc',
+        lambda *args: reads.append(args) or read_perkin_elmer_asc(*args),
+    )
+    normalize_all(archive)
+    assert not reads
+    assert archive.data.figures[0] is figures[0]
+
+    with open(data_file, 'a') as file:
+        file.write('\n')
+    normalize_all(archive)
+    assert len(reads) == 1
+    assert archive.data.figures[0] is figures[0]
+
+
+def test_normalize_links_instrument_uploaded_later(tmp_path, monkeypatch):
+    schema = importlib.import_module('transmission.schema')
+    data_file = str(tmp_path / 'KTF-D.Probe.Raw.asc')
+    shutil.copy(
+        os.path.join(os.path.dirname(__file__), 'data', 'KTF-D.Probe.Raw.asc'),
+        data_file,
+    )
+    run_parser(data_file, parser_entry_point.load())
+    archive = parse(str(tmp_path / 'KTF-D.Probe.Raw.archive.json'))[0]
+    normalize_all(archive)
+    assert not archive.data.instruments
+
+    serial_numbers = []
+    instrument = schema.Spectrophotometer(name='Lambda 950')
+
+    def get_instrument_reference(self, data_dict, archive, logger):
+        serial_numbers.append(data_dict['instrument_serial_number'])
+        return schema.InstrumentReference(reference=instrument)
+
+    monkeypatch.setattr(
+        schema.ELNUVVisNirTransmission,
+        'get_instrument_reference',
+        get_instrument_reference,
+    )
+    reads = []
+    monkeypatch.setattr(
+        schema, 'read_perkin_elmer_asc', lambda *args: reads.append(args)
+    )
+    normalize_all(archive)
+    assert not reads
+    assert archive.data.instruments[0].reference is instrument
+
+    normalize_all(archive)
+    assert len(serial_numbers) == 1
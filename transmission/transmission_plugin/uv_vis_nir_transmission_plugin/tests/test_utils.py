@@ -0,0 +1,240 @@
+import importlib
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import structlog
+from nomad.datamodel import EntryArchive, EntryMetadata, User
+
+from transmission.utils import (
+    InstrumentRegistry,
+    InstrumentResolver,
+    MergeDifference,
+    arrays_checksum,
+    file_checksum,
+    merge_sections,
+)
+
+SCHEMA = 'transmission.schema.Spectrophotometer'
+
+
+class InMemorySearch:
+    """
+    A stand-in for `nomad.search.search` over a list of entries.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.calls = 0
+
+    def __call__(self, owner, query, user_id, **kwargs):
+        self.calls += 1
+        serial_number = query[f'data.serial_number#{SCHEMA}']
+        return SimpleNamespace(
+            data=[
+                entry
+                for entry in self.entries
+                if entry['entry_type'] in query['entry_type:any']
+                and entry['data']['serial_number'] == serial_number
+            ]
+        )
+
+
+def test_instrument_resolver():
+    search = InMemorySearch(
+        [
+            {
+                'upload_id': 'instruments',
+                'entry_id': 'lambda',
+                'entry_type': 'PerkinElmersLambdaSpectrophotometer',
+                'data': {'serial_number': '1050'},
+            },
+            {
+                'upload_id': 'instruments',
+                'entry_id': 'sample',
+                'entry_type': 'Sample',
+                'data': {'serial_number': '1050'},
+            },
+        ]
+    )
+    resolver = InstrumentResolver(
+        entry_types=['Spectrophotometer', 'PerkinElmersLambdaSpectrophotometer'],
+        schema=SCHEMA,
+        search_function=search,
+    )
+    for _ in range(300):
+        references = resolver.resolve('1050', 'upload', 'user')
+        assert references == ['../uploads/instruments/archive/lambda#/data']
+    assert search.calls == 1
+    assert (resolver.hits, resolver.misses) == (299, 1)
+
+    assert resolver.resolve('950', 'upload', 'user') == []
+    resolver.register('950', 'upload', 'user', '../uploads/upload/archive/new#/data')
+    assert resolver.resolve('950', 'upload', 'user') == [
+        '../uploads/upload/archive/new#/data'
+    ]
+    assert search.calls == 2  # noqa: PLR2004
+
+    resolver.ttl = 0
+    resolver.resolve('1050', 'upload', 'user')
+    assert search.calls == 3  # noqa: PLR2004
+
+
+def test_concurrent_instrument_creation(monkeypatch):
+    schema = importlib.import_module('transmission.schema')
+    search = InMemorySearch([])
+    resolver = InstrumentResolver(
+        entry_types=['Spectrophotometer', 'PerkinElmersLambdaSpectrophotometer'],
+        schema=SCHEMA,
+        search_function=search,
+    )
+    monkeypatch.setattr(schema, 'instrument_resolver', resolver)
+    monkeypatch.setattr(schema, 'instrument_registry', schema.InstrumentRegistry())
+
+    created = []
+    lock = threading.Lock()
+
+    def create_archive(entity, archive, file_name):
+        time.sleep(0.01)  # widen the window for races
+        with lock:
+            created.append(file_name)
+        return f'../uploads/{archive.metadata.upload_id}/archive/{file_name}#/data'
+
+    monkeypatch.setattr(schema, 'create_archive', create_archive)
+    archive = EntryArchive(
+        metadata=EntryMetadata(upload_id='upload', main_author=User(user_id='user'))
+    )
+    data_dict = {
+        'instrument_name': 'Lambda 1050',
+        'instrument_serial_number': '1050',
+        'instrument_firmware_version': '1.0',
+        'start_datetime': None,
+    }
+    logger = structlog.get_logger()
+
+    def get_reference(_):
+        measurement = schema.ELNUVVisNirTransmission()
+        reference = measurement.get_instrument_reference(data_dict, archive, logger)
+        return reference.reference.m_proxy_value
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        references = list(executor.map(get_reference, range(200)))
+
+    assert created == ['Lambda_1050_1050.archive.json']
+    assert set(references) == {
+        '../uploads/upload/archive/Lambda_1050_1050.archive.json#/data'
+    }
+    assert search.calls == 1
+
+
+def test_instrument_registry_expiry(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    registry = InstrumentRegistry(ttl=10)
+    created = []
+
+    def create():
+        created.append(f'reference {len(created)}')
+        return created[-1]
+
+    def resolve():
+        return []
+
+    assert registry.get_or_create('upload', '1050', resolve, create) == ['reference 0']
+    now[0] = 5.0
+    assert registry.get_or_create('upload', '1050', resolve, create) == ['reference 0']
+    now[0] = 15.0
+    assert registry.get_or_create('upload', '1050', resolve, create) == ['reference 1']
+    assert registry.created == len(created) == 2  # noqa: PLR2004
+
+
+def test_instrument_registry_locks():
+    registry = InstrumentRegistry()
+
+    def fail():
+        raise RuntimeError('search failed')
+
+    def resolve(upload_id):
+        serial_number = f'{upload_id}-serial'
+        return registry.get_or_create(
+            upload_id, serial_number, lambda: [serial_number], fail
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        references = list(
+            executor.map(resolve, [f'upload {i % 50}' for i in range(400)])
+        )
+    assert references[0] == ['upload 0-serial']
+    with pytest.raises(RuntimeError):
+        registry.get_or_create('upload', '1050', fail, fail)
+    assert not registry._locks
+
+
+def test_checksums():
+    assert file_checksum(io.BytesIO(b'abc')) == file_checksum(io.BytesIO(b'abc'))
+    assert file_checksum(io.BytesIO(b'abc')) != file_checksum(io.BytesIO(b'abd'))
+
+    wavelength = np.linspace(200, 2500, 1000)
+    absorbance = np.sin(wavelength)
+    checksum = arrays_checksum(wavelength, absorbance)
+    assert arrays_checksum(wavelength.copy(), absorbance.copy()) == checksum
+    assert arrays_checksum(wavelength[::-1][::-1], absorbance) == checksum
+    assert arrays_checksum(wavelength, absorbance, None) != checksum
+    assert arrays_checksum(wavelength.astype(np.float32), absorbance) != checksum
+    assert arrays_checksum(wavelength.reshape(10, 100), absorbance) != checksum
+    absorbance[500] += 1e-12
+    assert arrays_checksum(wavelength, absorbance) != checksum
+
+
+def test_merge_sections():
+    schema = importlib.import_module('transmission.schema')
+
+    def settings(widths, wavelength):
+        return schema.ELNUVVisNirTransmission(
+            transmission_settings=schema.UVVisNirTransmissionSettings(
+                monochromator_slit_width=[
+                    schema.MonochromatorSlitWidth(slit_width=slit_width)
+                    for slit_width in widths
+                ],
+            ),
+            results=[schema.UVVisNirTransmissionResult(wavelength=wavelength)],
+        )
+
+    wavelength = np.linspace(200, 2500, 1000)
+    wavelength[0] = np.nan
+    slit_width, update_slit_width = 2.0, 3.0
+    section = settings([1.0, slit_width], wavelength)
+    update = settings([1.0, update_slit_width], wavelength.copy())
+    slit_widths = section.transmission_settings.monochromator_slit_width
+    update.name = 'measurement'
+    warnings = []
+    differences = merge_sections(
+        section, update, logger=SimpleNamespace(warning=warnings.append)
+    )
+    assert section.name == 'measurement'
+    assert differences == [
+        MergeDifference(
+            'transmission_settings/monochromator_slit_width/1', 'slit_width', 'quantity'
+        )
+    ]
+    assert slit_widths[1].slit_width.magnitude == slit_width
+    assert len(warnings) == 1
+
+    differences = merge_sections(section, update, overwrite_quantity=True)
+    assert differences[0].overwritten
+    assert slit_widths[1].slit_width.magnitude == update_slit_width
+
+    update = settings([1.0], wavelength[:-1])
+    assert merge_sections(section, update) == [
+        MergeDifference('results/0', 'wavelength', 'quantity'),
+        MergeDifference(
+            'transmission_settings', 'monochromator_slit_width', 'sub_section'
+        ),
+    ]
+
+    with pytest.raises(TypeError):
+        merge_sections(section, schema.UVVisNirTransmissionSettings())